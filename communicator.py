@@ -47,7 +47,7 @@ class CommunicatorAgent:
             return notification
             
         except Exception as e:
-            self.logger.error(f"Error sending maintenance alert: {str(e)}")
+            self.logger.error("Error sending maintenance alert: %s", e)
             return {'error': str(e)}
     
     def send_booking_confirmation(self, booking_data: Dict, workshop_email: str) -> Dict:
@@ -75,7 +75,7 @@ class CommunicatorAgent:
             return notification
             
         except Exception as e:
-            self.logger.error(f"Error sending booking confirmation: {str(e)}")
+            self.logger.error("Error sending booking confirmation: %s", e)
             return {'error': str(e)}
     
     def send_workshop_availability_request(self, workshop_id: str, date: str, services: List[str]) -> Dict:
@@ -108,7 +108,7 @@ class CommunicatorAgent:
                 return {'error': 'Workshop email not found'}
                 
         except Exception as e:
-            self.logger.error(f"Error sending availability request: {str(e)}")
+            self.logger.error("Error sending availability request: %s", e)
             return {'error': str(e)}
     
     def send_emergency_notification(self, vehicle_id: str, emergency_data: Dict, recipients: List[str]) -> Dict:
@@ -137,7 +137,7 @@ class CommunicatorAgent:
             return notification
             
         except Exception as e:
-            self.logger.error(f"Error sending emergency notification: {str(e)}")
+            self.logger.error("Error sending emergency notification: %s", e)
             return {'error': str(e)}
     
     def _create_maintenance_alert_email(self, vehicle_id: str, alert_data: Dict) -> str:
@@ -264,11 +264,11 @@ class CommunicatorAgent:
                 server.login(self.smtp_config['username'], self.smtp_config['password'])
                 server.send_message(msg)
             
-            self.logger.info(f"Email sent successfully to {recipient}")
+            self.logger.info("Email sent successfully to %s", recipient)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to send email to {recipient}: {str(e)}")
+            self.logger.error("Failed to send email to %s: %s", recipient, e)
             return False
     
     def _get_workshop_email(self, workshop_id: str) -> Optional[str]:
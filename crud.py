@@ -1,25 +1,46 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
-from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, desc, func, insert, literal, select, update
+from typing import AsyncIterator, List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from cachetools import TTLCache
 import json
 
 from .database import (
     Vehicle, TelemetryRecord, HealthAnalysis, MaintenanceTask, 
-    Booking, Workshop, Alert, MaintenanceHistory
+    Booking, Workshop, Alert, MaintenanceHistory, SystemState
 )
-from .models import VehicleCreate, VehicleUpdate, TelemetryData
+from .models import VehicleCreate, TelemetryData
+
+# Rows fetched per round-trip when streaming history
+STREAM_BATCH_SIZE = 500
+
+# Workshops change rarely, so lookups are served from memory and may be
+# up to WORKSHOP_CACHE_TTL seconds stale
+WORKSHOP_CACHE_TTL = 300
+workshop_cache = TTLCache(maxsize=512, ttl=WORKSHOP_CACHE_TTL)
+
+async def _update_returning(db: AsyncSession, model, condition, changes: Dict[str, Any]):
+    """Apply changes to the matching row in one UPDATE ... RETURNING; updated_at is set by the column's onupdate"""
+    values = {field: value for field, value in changes.items() if field in model.__table__.c}
+    updated = await db.scalar(update(model).where(condition).values(**values).returning(model))
+    await db.commit()
+    return updated
 
 # Vehicle CRUD operations
-def get_vehicles(db: Session, skip: int = 0, limit: int = 100) -> List[Vehicle]:
+async def get_vehicles(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Vehicle]:
     """Get all vehicles with pagination"""
-    return db.query(Vehicle).offset(skip).limit(limit).all()
+    result = await db.scalars(select(Vehicle).offset(skip).limit(limit))
+    return result.all()
 
-def get_vehicle(db: Session, vehicle_id: str) -> Optional[Vehicle]:
+async def get_vehicle(db: AsyncSession, vehicle_id: str) -> Optional[Vehicle]:
     """Get a specific vehicle by ID"""
-    return db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    return await db.get(Vehicle, vehicle_id)
+
+async def get_vehicle_updated_at(db: AsyncSession, vehicle_id: str) -> Optional[datetime]:
+    """Get only the last update time of a vehicle"""
+    return await db.scalar(select(Vehicle.updated_at).where(Vehicle.id == vehicle_id))
 
-def create_vehicle(db: Session, vehicle: VehicleCreate) -> Vehicle:
+async def create_vehicle(db: AsyncSession, vehicle: VehicleCreate) -> Vehicle:
     """Create a new vehicle"""
     db_vehicle = Vehicle(
         id=vehicle.id,
@@ -31,41 +52,35 @@ def create_vehicle(db: Session, vehicle: VehicleCreate) -> Vehicle:
         location=vehicle.location
     )
     db.add(db_vehicle)
-    db.commit()
-    db.refresh(db_vehicle)
+    await db.commit()
+    await db.refresh(db_vehicle)
     return db_vehicle
 
-def update_vehicle(db: Session, vehicle_id: str, vehicle_update: VehicleUpdate) -> Optional[Vehicle]:
-    """Update a vehicle"""
-    db_vehicle = get_vehicle(db, vehicle_id)
-    if db_vehicle:
-        update_data = vehicle_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_vehicle, field, value)
-        db_vehicle.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_vehicle)
-    return db_vehicle
+async def update_vehicle(db: AsyncSession, vehicle_id: str, vehicle_data: Dict[str, Any]) -> Optional[Vehicle]:
+    """Update a vehicle with the given changed fields"""
+    return await _update_returning(db, Vehicle, Vehicle.id == vehicle_id, vehicle_data)
 
-def delete_vehicle(db: Session, vehicle_id: str) -> bool:
+async def delete_vehicle(db: AsyncSession, vehicle_id: str) -> bool:
     """Delete a vehicle"""
-    db_vehicle = get_vehicle(db, vehicle_id)
+    db_vehicle = await get_vehicle(db, vehicle_id)
     if db_vehicle:
-        db.delete(db_vehicle)
-        db.commit()
+        await db.delete(db_vehicle)
+        await db.commit()
         return True
     return False
 
-def get_vehicles_by_status(db: Session, status: str) -> List[Vehicle]:
+async def get_vehicles_by_status(db: AsyncSession, status: str) -> List[Vehicle]:
     """Get vehicles by status"""
-    return db.query(Vehicle).filter(Vehicle.status == status).all()
+    result = await db.scalars(select(Vehicle).where(Vehicle.status == status))
+    return result.all()
 
-def get_vehicles_needing_maintenance(db: Session, health_threshold: int = 50) -> List[Vehicle]:
+async def get_vehicles_needing_maintenance(db: AsyncSession, health_threshold: int = 50) -> List[Vehicle]:
     """Get vehicles that need maintenance based on health score"""
-    return db.query(Vehicle).filter(Vehicle.health_score < health_threshold).all()
+    result = await db.scalars(select(Vehicle).where(Vehicle.health_score < health_threshold))
+    return result.all()
 
 # Telemetry CRUD operations
-def create_telemetry_record(db: Session, telemetry_data: TelemetryData) -> TelemetryRecord:
+async def create_telemetry_record(db: AsyncSession, telemetry_data: TelemetryData) -> TelemetryRecord:
     """Create a new telemetry record"""
     db_telemetry = TelemetryRecord(
         vehicle_id=telemetry_data.vehicle_id,
@@ -81,53 +96,78 @@ def create_telemetry_record(db: Session, telemetry_data: TelemetryData) -> Telem
         timestamp=telemetry_data.timestamp
     )
     db.add(db_telemetry)
-    db.commit()
-    db.refresh(db_telemetry)
+    await db.commit()
+    await db.refresh(db_telemetry)
     return db_telemetry
 
-def get_telemetry_history(db: Session, vehicle_id: str, limit: int = 100) -> List[TelemetryRecord]:
+async def create_telemetry_records(db: AsyncSession, telemetry_rows: List[Dict[str, Any]]) -> int:
+    """Create telemetry records from dumped TelemetryData rows in a single bulk insert"""
+    if not telemetry_rows:
+        return 0
+    await db.execute(insert(TelemetryRecord), telemetry_rows)
+    await db.commit()
+    return len(telemetry_rows)
+
+async def get_telemetry_history(db: AsyncSession, vehicle_id: str, limit: int = 100) -> List[TelemetryRecord]:
     """Get telemetry history for a vehicle"""
-    return db.query(TelemetryRecord).filter(
+    result = await db.scalars(select(TelemetryRecord).where(
         TelemetryRecord.vehicle_id == vehicle_id
-    ).order_by(desc(TelemetryRecord.timestamp)).limit(limit).all()
+    ).order_by(desc(TelemetryRecord.timestamp)).limit(limit))
+    return result.all()
 
-def get_latest_telemetry(db: Session, vehicle_id: str) -> Optional[TelemetryRecord]:
+async def stream_telemetry_history(db: AsyncSession, vehicle_id: str, limit: int = 100) -> AsyncIterator[TelemetryRecord]:
+    """Stream telemetry history for a vehicle without loading it all into memory"""
+    result = await db.stream_scalars(select(TelemetryRecord).where(
+        TelemetryRecord.vehicle_id == vehicle_id
+    ).order_by(desc(TelemetryRecord.timestamp)).limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for record in result:
+        yield record
+
+async def get_latest_telemetry(db: AsyncSession, vehicle_id: str) -> Optional[TelemetryRecord]:
     """Get the latest telemetry record for a vehicle"""
-    return db.query(TelemetryRecord).filter(
+    return await db.scalar(select(TelemetryRecord).where(
         TelemetryRecord.vehicle_id == vehicle_id
-    ).order_by(desc(TelemetryRecord.timestamp)).first()
+    ).order_by(desc(TelemetryRecord.timestamp)).limit(1))
 
 # Health Analysis CRUD operations
-def create_health_analysis(db: Session, vehicle_id: str, health_data: Dict[str, Any]) -> HealthAnalysis:
+async def create_health_analysis(db: AsyncSession, vehicle_id: str, health_data: Dict[str, Any]) -> HealthAnalysis:
     """Create a new health analysis record"""
     db_health = HealthAnalysis(
         vehicle_id=vehicle_id,
         health_score=health_data.get('health_score', 0),
-        anomalies=json.dumps(health_data.get('anomalies', [])),
-        maintenance_predictions=json.dumps(health_data.get('maintenance_predictions', [])),
-        alerts=json.dumps(health_data.get('alerts', [])),
-        recommendations=json.dumps(health_data.get('recommendations', [])),
-        timestamp=datetime.utcnow()
+        anomalies=health_data.get('anomalies', []),
+        maintenance_predictions=health_data.get('maintenance_predictions', []),
+        alerts=health_data.get('alerts', []),
+        recommendations=health_data.get('recommendations', [])
     )
     db.add(db_health)
-    db.commit()
-    db.refresh(db_health)
+    await db.commit()
+    await db.refresh(db_health)
     return db_health
 
-def get_health_history(db: Session, vehicle_id: str, limit: int = 50) -> List[HealthAnalysis]:
+async def get_health_history(db: AsyncSession, vehicle_id: str, limit: int = 50) -> List[HealthAnalysis]:
     """Get health analysis history for a vehicle"""
-    return db.query(HealthAnalysis).filter(
+    result = await db.scalars(select(HealthAnalysis).where(
+        HealthAnalysis.vehicle_id == vehicle_id
+    ).order_by(desc(HealthAnalysis.timestamp)).limit(limit))
+    return result.all()
+
+async def stream_health_history(db: AsyncSession, vehicle_id: str, limit: int = 50) -> AsyncIterator[HealthAnalysis]:
+    """Stream health analysis history for a vehicle without loading it all into memory"""
+    result = await db.stream_scalars(select(HealthAnalysis).where(
         HealthAnalysis.vehicle_id == vehicle_id
-    ).order_by(desc(HealthAnalysis.timestamp)).limit(limit).all()
+    ).order_by(desc(HealthAnalysis.timestamp)).limit(limit).execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for record in result:
+        yield record
 
-def get_latest_health_analysis(db: Session, vehicle_id: str) -> Optional[HealthAnalysis]:
+async def get_latest_health_analysis(db: AsyncSession, vehicle_id: str) -> Optional[HealthAnalysis]:
     """Get the latest health analysis for a vehicle"""
-    return db.query(HealthAnalysis).filter(
+    return await db.scalar(select(HealthAnalysis).where(
         HealthAnalysis.vehicle_id == vehicle_id
-    ).order_by(desc(HealthAnalysis.timestamp)).first()
+    ).order_by(desc(HealthAnalysis.timestamp)).limit(1))
 
 # Maintenance Task CRUD operations
-def create_maintenance_task(db: Session, task_data: Dict[str, Any]) -> MaintenanceTask:
+async def create_maintenance_task(db: AsyncSession, task_data: Dict[str, Any]) -> MaintenanceTask:
     """Create a new maintenance task"""
     db_task = MaintenanceTask(
         vehicle_id=task_data['vehicle_id'],
@@ -140,140 +180,179 @@ def create_maintenance_task(db: Session, task_data: Dict[str, Any]) -> Maintenan
         status=task_data.get('status', 'pending')
     )
     db.add(db_task)
-    db.commit()
-    db.refresh(db_task)
+    await db.commit()
+    await db.refresh(db_task)
     return db_task
 
-def get_maintenance_tasks(db: Session, vehicle_id: Optional[str] = None, status: Optional[str] = None) -> List[MaintenanceTask]:
+async def get_maintenance_tasks(db: AsyncSession, vehicle_id: Optional[str] = None, status: Optional[str] = None) -> List[MaintenanceTask]:
     """Get maintenance tasks with optional filters"""
-    query = db.query(MaintenanceTask)
+    query = select(MaintenanceTask)
     
     if vehicle_id:
-        query = query.filter(MaintenanceTask.vehicle_id == vehicle_id)
+        query = query.where(MaintenanceTask.vehicle_id == vehicle_id)
     
     if status:
-        query = query.filter(MaintenanceTask.status == status)
+        query = query.where(MaintenanceTask.status == status)
     
-    return query.order_by(desc(MaintenanceTask.created_at)).all()
+    result = await db.scalars(query.order_by(desc(MaintenanceTask.created_at)))
+    return result.all()
 
-def update_maintenance_task(db: Session, task_id: int, task_data: Dict[str, Any]) -> Optional[MaintenanceTask]:
+async def update_maintenance_task(db: AsyncSession, task_id: int, task_data: Dict[str, Any]) -> Optional[MaintenanceTask]:
     """Update a maintenance task"""
-    db_task = db.query(MaintenanceTask).filter(MaintenanceTask.id == task_id).first()
-    if db_task:
-        for field, value in task_data.items():
-            if value is not None:
-                setattr(db_task, field, value)
-        db_task.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_task)
-    return db_task
+    changes = {field: value for field, value in task_data.items() if value is not None}
+    return await _update_returning(db, MaintenanceTask, MaintenanceTask.id == task_id, changes)
 
 # Booking CRUD operations
-def create_booking(db: Session, booking_data: Dict[str, Any]) -> Booking:
-    """Create a new booking"""
-    db_booking = Booking(
-        booking_id=booking_data['booking_id'],
-        vehicle_id=booking_data['vehicle_id'],
-        workshop_id=booking_data['workshop_id'],
-        workshop_name=booking_data['workshop_name'],
-        task_type=booking_data['task_type'],
-        scheduled_date=booking_data['scheduled_date'],
-        scheduled_time=booking_data['scheduled_time'],
-        estimated_duration=booking_data['estimated_duration'],
-        estimated_cost=booking_data['estimated_cost'],
-        urgency=booking_data['urgency'],
-        status=booking_data.get('status', 'scheduled')
+async def create_booking(db: AsyncSession, booking_data: Dict[str, Any]) -> Optional[Booking]:
+    """Create a new booking, taking the workshop name from the workshops table in the same statement"""
+    values = {
+        'vehicle_id': booking_data['vehicle_id'],
+        'workshop_id': booking_data['workshop_id'],
+        'task_type': booking_data['task_type'],
+        'scheduled_date': booking_data['scheduled_date'],
+        'scheduled_time': booking_data['scheduled_time'],
+        'estimated_duration': booking_data['estimated_duration'],
+        'estimated_cost': booking_data['estimated_cost'],
+        'urgency': booking_data['urgency'],
+        'status': booking_data.get('status', 'scheduled')
+    }
+    if 'booking_id' in booking_data:
+        values['booking_id'] = booking_data['booking_id']
+    
+    # INSERT ... SELECT ... FROM workshops RETURNING: no row is inserted for an unknown workshop
+    workshop_row = select(
+        *[literal(value, Booking.__table__.c[key].type) for key, value in values.items()],
+        Workshop.name
+    ).where(Workshop.id == booking_data['workshop_id'])
+    
+    db_booking = await db.scalar(
+        insert(Booking)
+        .from_select([*values, 'workshop_name'], workshop_row)
+        .returning(Booking)
     )
-    db.add(db_booking)
-    db.commit()
-    db.refresh(db_booking)
+    await db.commit()
     return db_booking
 
-def get_bookings(db: Session, vehicle_id: Optional[str] = None, status: Optional[str] = None) -> List[Booking]:
+async def get_bookings(db: AsyncSession, vehicle_id: Optional[str] = None, status: Optional[str] = None) -> List[Booking]:
     """Get bookings with optional filters"""
-    query = db.query(Booking)
+    query = select(Booking)
     
     if vehicle_id:
-        query = query.filter(Booking.vehicle_id == vehicle_id)
+        query = query.where(Booking.vehicle_id == vehicle_id)
     
     if status:
-        query = query.filter(Booking.status == status)
+        query = query.where(Booking.status == status)
     
-    return query.order_by(desc(Booking.created_at)).all()
+    result = await db.scalars(query.order_by(desc(Booking.created_at)))
+    return result.all()
 
-def get_booking(db: Session, booking_id: str) -> Optional[Booking]:
+async def get_booking(db: AsyncSession, booking_id: str) -> Optional[Booking]:
     """Get a specific booking by ID"""
-    return db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    return await db.scalar(select(Booking).where(Booking.booking_id == booking_id))
 
-def update_booking(db: Session, booking_id: str, booking_data: Dict[str, Any]) -> Optional[Booking]:
+async def update_booking(db: AsyncSession, booking_id: str, booking_data: Dict[str, Any]) -> Optional[Booking]:
     """Update a booking"""
-    db_booking = get_booking(db, booking_id)
-    if db_booking:
-        for field, value in booking_data.items():
-            if value is not None:
-                setattr(db_booking, field, value)
-        db_booking.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(db_booking)
-    return db_booking
+    changes = {field: value for field, value in booking_data.items() if value is not None}
+    return await _update_returning(db, Booking, Booking.booking_id == booking_id, changes)
 
-def cancel_booking(db: Session, booking_id: str) -> Optional[Booking]:
+async def cancel_booking(db: AsyncSession, booking_id: str) -> Optional[Booking]:
     """Cancel a booking"""
-    return update_booking(db, booking_id, {'status': 'cancelled'})
+    return await update_booking(db, booking_id, {'status': 'cancelled'})
 
 # Workshop CRUD operations
-def get_workshops(db: Session) -> List[Workshop]:
+def _workshop_dict(workshop: Workshop) -> Dict[str, Any]:
+    """Convert a workshop row to the Workshop response shape, decoding its JSON columns"""
+    return {
+        "id": workshop.id,
+        "name": workshop.name,
+        "location": workshop.location,
+        "services": json.loads(workshop.services),
+        "rating": workshop.rating,
+        "cost_multiplier": workshop.cost_multiplier,
+        "availability": json.loads(workshop.availability)
+    }
+
+async def get_workshops(db: AsyncSession) -> List[Dict[str, Any]]:
     """Get all workshops"""
-    return db.query(Workshop).all()
+    workshops = workshop_cache.get('all')
+    if workshops is None:
+        result = await db.scalars(select(Workshop))
+        workshops = workshop_cache['all'] = [_workshop_dict(w) for w in result]
+    return workshops
 
-def get_workshop(db: Session, workshop_id: str) -> Optional[Workshop]:
+async def get_workshop(db: AsyncSession, workshop_id: str) -> Optional[Dict[str, Any]]:
     """Get a specific workshop by ID"""
-    return db.query(Workshop).filter(Workshop.id == workshop_id).first()
-
-def get_workshops_by_service(db: Session, service: str) -> List[Workshop]:
+    workshop = workshop_cache.get(('id', workshop_id))
+    if workshop is None:
+        row = await db.get(Workshop, workshop_id)
+        if row:
+            workshop = workshop_cache[('id', workshop_id)] = _workshop_dict(row)
+    return workshop
+
+async def get_workshops_by_service(db: AsyncSession, service: str) -> List[Dict[str, Any]]:
     """Get workshops that provide a specific service"""
-    workshops = db.query(Workshop).all()
-    return [w for w in workshops if service in json.loads(w.services)]
+    workshops = workshop_cache.get(('service', service))
+    if workshops is None:
+        workshops = workshop_cache[('service', service)] = [
+            w for w in await get_workshops(db) if service in w['services']
+        ]
+    return workshops
 
 # Alert CRUD operations
-def create_alert(db: Session, alert_data: Dict[str, Any]) -> Alert:
+async def create_alert(db: AsyncSession, alert_data: Dict[str, Any]) -> Alert:
     """Create a new alert"""
     db_alert = Alert(
         alert_id=alert_data['id'],
         vehicle_id=alert_data['vehicle_id'],
         type=alert_data['type'],
         message=alert_data['message'],
-        action_required=alert_data.get('action_required', True),
-        timestamp=alert_data.get('timestamp', datetime.utcnow())
+        action_required=alert_data.get('action_required', True)
     )
+    if alert_data.get('timestamp'):
+        db_alert.timestamp = alert_data['timestamp']
     db.add(db_alert)
-    db.commit()
-    db.refresh(db_alert)
+    await db.commit()
+    await db.refresh(db_alert)
     return db_alert
 
-def get_alerts(db: Session, vehicle_id: Optional[str] = None, unread_only: bool = False) -> List[Alert]:
-    """Get alerts with optional filters"""
-    query = db.query(Alert)
+def _alert_filters(vehicle_id: Optional[str], unread_only: bool) -> List[Any]:
+    """Build the WHERE conditions shared by the alert queries"""
+    filters = []
     
     if vehicle_id:
-        query = query.filter(Alert.vehicle_id == vehicle_id)
+        filters.append(Alert.vehicle_id == vehicle_id)
     
     if unread_only:
-        query = query.filter(Alert.read == False)
+        filters.append(Alert.read == False)
     
-    return query.order_by(desc(Alert.timestamp)).all()
+    return filters
 
-def mark_alert_read(db: Session, alert_id: str) -> Optional[Alert]:
+async def get_alerts(db: AsyncSession, vehicle_id: Optional[str] = None, unread_only: bool = False) -> List[Alert]:
+    """Get alerts with optional filters"""
+    query = select(Alert).where(*_alert_filters(vehicle_id, unread_only))
+    result = await db.scalars(query.order_by(desc(Alert.timestamp)))
+    return result.all()
+
+async def get_alerts_version(db: AsyncSession, vehicle_id: Optional[str] = None, unread_only: bool = False) -> tuple:
+    """Get a cheap fingerprint of the alerts matching the filters: count, newest ID and read count"""
+    result = await db.execute(select(
+        func.count(Alert.id),
+        func.max(Alert.id),
+        func.count(Alert.id).filter(Alert.read == True)
+    ).where(*_alert_filters(vehicle_id, unread_only)))
+    return tuple(result.one())
+
+async def mark_alert_read(db: AsyncSession, alert_id: str) -> Optional[Alert]:
     """Mark an alert as read"""
-    db_alert = db.query(Alert).filter(Alert.alert_id == alert_id).first()
+    db_alert = await db.scalar(select(Alert).where(Alert.alert_id == alert_id))
     if db_alert:
         db_alert.read = True
-        db.commit()
-        db.refresh(db_alert)
+        await db.commit()
+        await db.refresh(db_alert)
     return db_alert
 
 # Maintenance History CRUD operations
-def create_maintenance_history(db: Session, history_data: Dict[str, Any]) -> MaintenanceHistory:
+async def create_maintenance_history(db: AsyncSession, history_data: Dict[str, Any]) -> MaintenanceHistory:
     """Create a new maintenance history record"""
     db_history = MaintenanceHistory(
         vehicle_id=history_data['vehicle_id'],
@@ -287,73 +366,111 @@ def create_maintenance_history(db: Session, history_data: Dict[str, Any]) -> Mai
         notes=history_data.get('notes')
     )
     db.add(db_history)
-    db.commit()
-    db.refresh(db_history)
+    await db.commit()
+    await db.refresh(db_history)
     return db_history
 
-def get_maintenance_history(db: Session, vehicle_id: str, limit: int = 50) -> List[MaintenanceHistory]:
+async def get_maintenance_history(db: AsyncSession, vehicle_id: str, limit: int = 50) -> List[MaintenanceHistory]:
     """Get maintenance history for a vehicle"""
-    return db.query(MaintenanceHistory).filter(
+    result = await db.scalars(select(MaintenanceHistory).where(
         MaintenanceHistory.vehicle_id == vehicle_id
-    ).order_by(desc(MaintenanceHistory.timestamp)).limit(limit).all()
+    ).order_by(desc(MaintenanceHistory.timestamp)).limit(limit))
+    return result.all()
 
 # Analytics and Reporting
-def get_fleet_summary(db: Session) -> Dict[str, Any]:
-    """Get fleet summary statistics"""
-    total_vehicles = db.query(Vehicle).count()
-    active_vehicles = db.query(Vehicle).filter(Vehicle.status == 'active').count()
-    maintenance_vehicles = db.query(Vehicle).filter(Vehicle.status == 'maintenance').count()
-    
-    # Get average health score
-    vehicles_with_health = db.query(Vehicle).filter(Vehicle.health_score.isnot(None)).all()
-    avg_health_score = 0
-    if vehicles_with_health:
-        avg_health_score = sum(v.health_score for v in vehicles_with_health) / len(vehicles_with_health)
+async def get_fleet_summary(db: AsyncSession) -> Dict[str, Any]:
+    """Get fleet summary statistics in a single aggregate query"""
+    result = await db.execute(select(
+        func.count(),
+        func.count().filter(Vehicle.status == 'active'),
+        func.count().filter(Vehicle.status == 'maintenance'),
+        func.avg(Vehicle.health_score),
+        func.count().filter(Vehicle.health_score < 50)
+    ).select_from(Vehicle))
+    total_vehicles, active_vehicles, maintenance_vehicles, avg_health_score, needing_maintenance = result.one()
     
     return {
         'total_vehicles': total_vehicles,
         'active_vehicles': active_vehicles,
         'maintenance_vehicles': maintenance_vehicles,
-        'average_health_score': round(avg_health_score, 2),
-        'vehicles_needing_maintenance': db.query(Vehicle).filter(Vehicle.health_score < 50).count()
+        'average_health_score': round(avg_health_score or 0, 2),
+        'vehicles_needing_maintenance': needing_maintenance
     }
 
-def get_maintenance_cost_summary(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+async def get_latest_fleet_telemetry(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Get the latest telemetry reading of every vehicle in a single query"""
+    ranked = select(
+        TelemetryRecord,
+        func.row_number().over(
+            partition_by=TelemetryRecord.vehicle_id,
+            order_by=(desc(TelemetryRecord.timestamp), desc(TelemetryRecord.id))
+        ).label('rank')
+    ).subquery()
+    result = await db.execute(select(ranked).where(ranked.c.rank == 1))
+    return [dict(row) for row in result.mappings()]
+
+async def set_system_status(db: AsyncSession, status: str) -> None:
+    """Record the system status reported by the agents, shared by every process"""
+    await db.merge(SystemState(key='status', value=status))
+    await db.commit()
+
+async def get_system_status(db: AsyncSession) -> Dict[str, Any]:
+    """Get the recorded system status and its counters in a single query"""
+    status = select(SystemState.value).where(SystemState.key == 'status').scalar_subquery()
+    active_vehicles = select(func.count()).select_from(Vehicle).where(
+        Vehicle.status == 'active'
+    ).scalar_subquery()
+    pending_maintenance = select(func.count()).select_from(MaintenanceTask).where(
+        MaintenanceTask.status == 'pending'
+    ).scalar_subquery()
+    result = await db.execute(select(func.coalesce(status, 'operational'), active_vehicles, pending_maintenance))
+    system_status, active_count, pending_count = result.one()
+    
+    return {
+        'status': system_status,
+        'active_vehicles': active_count,
+        'pending_maintenance': pending_count,
+        'last_updated': datetime.now()
+    }
+
+async def get_maintenance_cost_summary(db: AsyncSession, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
     """Get maintenance cost summary for a date range"""
-    history_records = db.query(MaintenanceHistory).filter(
+    result = await db.execute(select(
+        func.coalesce(func.sum(MaintenanceHistory.cost), 0),
+        func.coalesce(func.sum(MaintenanceHistory.duration_hours), 0),
+        func.count()
+    ).where(
         and_(
             MaintenanceHistory.timestamp >= start_date,
             MaintenanceHistory.timestamp <= end_date
         )
-    ).all()
-    
-    total_cost = sum(record.cost or 0 for record in history_records)
-    total_duration = sum(record.duration_hours or 0 for record in history_records)
+    ))
+    total_cost, total_duration, maintenance_count = result.one()
     
     return {
         'total_cost': total_cost,
         'total_duration': total_duration,
-        'maintenance_count': len(history_records),
-        'average_cost_per_maintenance': total_cost / len(history_records) if history_records else 0
+        'maintenance_count': maintenance_count,
+        'average_cost_per_maintenance': total_cost / maintenance_count if maintenance_count else 0
     }
 
-def get_vehicle_analytics(db: Session, vehicle_id: str) -> Dict[str, Any]:
+async def get_vehicle_analytics(db: AsyncSession, vehicle_id: str) -> Dict[str, Any]:
     """Get analytics for a specific vehicle"""
-    vehicle = get_vehicle(db, vehicle_id)
+    vehicle = await get_vehicle(db, vehicle_id)
     if not vehicle:
         return {}
     
     # Get latest telemetry
-    latest_telemetry = get_latest_telemetry(db, vehicle_id)
+    latest_telemetry = await get_latest_telemetry(db, vehicle_id)
     
     # Get latest health analysis
-    latest_health = get_latest_health_analysis(db, vehicle_id)
+    latest_health = await get_latest_health_analysis(db, vehicle_id)
     
     # Get recent maintenance history
-    maintenance_history = get_maintenance_history(db, vehicle_id, limit=10)
+    maintenance_history = await get_maintenance_history(db, vehicle_id, limit=10)
     
     # Get recent bookings
-    recent_bookings = get_bookings(db, vehicle_id=vehicle_id, status='scheduled')
+    recent_bookings = await get_bookings(db, vehicle_id=vehicle_id, status='scheduled')
     
     return {
         'vehicle': vehicle,
@@ -1,22 +1,93 @@
 import sqlite3
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text
+import logging
+import time
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, Index, event, select, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
 from typing import Optional
 import os
+import uuid
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rental_fleet.db")
+ASYNC_DATABASE_URL = (
+    DATABASE_URL
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
+    .replace("postgresql://", "postgresql+asyncpg://", 1)
+)
+
+DEBUG = os.getenv("DEBUG", "false").lower() == "true"
+
+# Queries slower than this (seconds) are logged as warnings
+SLOW_QUERY_THRESHOLD = 0.1
+
+# Connection pool tuning for server databases; aiosqlite runs on a NullPool,
+# which takes no pool options
+POOL_OPTIONS = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800
+}
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+logger = logging.getLogger(__name__)
+
+# Create async SQLAlchemy engine
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
+    echo_pool="debug" if DEBUG else False,
+    **POOL_OPTIONS
 )
 
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _warn_slow_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    if elapsed > SLOW_QUERY_THRESHOLD:
+        logger.warning("Slow query (%.3fs): %s", elapsed, statement)
+
+# JSON column type: JSONB on PostgreSQL, JSON (stored as text) elsewhere
+JSONColumn = JSON().with_variant(JSONB(), "postgresql")
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time generated by the database, for column defaults
+
+    Columns use it as both default and server_default: the server default covers new
+    tables, and the default renders it into each INSERT so tables created before the
+    server defaults existed still get a timestamp
+    """
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has second resolution on SQLite
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now'))"
+
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+def new_booking_id() -> str:
+    """
+    Generate a unique, time-ordered booking ID (UUIDv7 layout)
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 4122 variant
+    return f"booking_{uuid.UUID(int=value)}"
 
 # Create Base class
 Base = declarative_base()
@@ -36,11 +107,14 @@ class Vehicle(Base):
     last_maintenance = Column(DateTime, nullable=True)
     mileage = Column(Integer, nullable=True)
     fuel_level = Column(Float, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
 class TelemetryRecord(Base):
     __tablename__ = "telemetry_records"
+    __table_args__ = (
+        Index("ix_telemetry_records_vehicle_timestamp", "vehicle_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(String, nullable=False, index=True)
@@ -53,22 +127,28 @@ class TelemetryRecord(Base):
     speed = Column(Float, nullable=False)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=utcnow(), server_default=utcnow())
 
 class HealthAnalysis(Base):
     __tablename__ = "health_analyses"
+    __table_args__ = (
+        Index("ix_health_analyses_vehicle_timestamp", "vehicle_id", "timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(String, nullable=False, index=True)
     health_score = Column(Integer, nullable=False)
-    anomalies = Column(Text, nullable=True)  # JSON string
-    maintenance_predictions = Column(Text, nullable=True)  # JSON string
-    alerts = Column(Text, nullable=True)  # JSON string
-    recommendations = Column(Text, nullable=True)  # JSON string
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    anomalies = Column(JSONColumn, nullable=True)
+    maintenance_predictions = Column(JSONColumn, nullable=True)
+    alerts = Column(JSONColumn, nullable=True)
+    recommendations = Column(JSONColumn, nullable=True)
+    timestamp = Column(DateTime, default=utcnow(), server_default=utcnow())
 
 class MaintenanceTask(Base):
     __tablename__ = "maintenance_tasks"
+    __table_args__ = (
+        Index("ix_maintenance_tasks_vehicle_status", "vehicle_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(String, nullable=False, index=True)
@@ -79,14 +159,17 @@ class MaintenanceTask(Base):
     description = Column(Text, nullable=True)
     preferred_date = Column(DateTime, nullable=True)
     status = Column(String, default="pending")
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_vehicle_status", "vehicle_id", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    booking_id = Column(String, unique=True, nullable=False, index=True)
+    booking_id = Column(String, unique=True, nullable=False, index=True, default=new_booking_id)
     vehicle_id = Column(String, nullable=False, index=True)
     workshop_id = Column(String, nullable=False)
     workshop_name = Column(String, nullable=False)
@@ -97,8 +180,8 @@ class Booking(Base):
     estimated_cost = Column(Float, nullable=False)
     urgency = Column(String, nullable=False)
     status = Column(String, default="scheduled")
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utcnow(), server_default=utcnow())
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
 
 class Workshop(Base):
     __tablename__ = "workshops"
@@ -115,6 +198,9 @@ class Workshop(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_vehicle_read", "vehicle_id", "read"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     alert_id = Column(String, unique=True, nullable=False, index=True)
@@ -122,7 +208,7 @@ class Alert(Base):
     type = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     action_required = Column(Boolean, default=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=utcnow(), server_default=utcnow())
     read = Column(Boolean, default=False)
 
 class MaintenanceHistory(Base):
@@ -136,33 +222,48 @@ class MaintenanceHistory(Base):
     workshop_id = Column(String, nullable=True)
     cost = Column(Float, nullable=True)
     duration_hours = Column(Float, nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=utcnow(), server_default=utcnow())
     status = Column(String, default="completed")
     notes = Column(Text, nullable=True)
 
+class SystemState(Base):
+    __tablename__ = "system_state"
+    
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    updated_at = Column(DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow())
+
 # Database dependency
-def get_db():
+async def get_db():
     """
     Database dependency for FastAPI
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Database initialization
-def init_db():
+def create_missing_indexes(conn):
+    """
+    Create any declared index missing from an existing database
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+async def init_db():
     """
     Initialize database tables
     """
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so add indexes introduced since
+        await conn.run_sync(create_missing_indexes)
     
     # Create default workshops if they don't exist
     db = SessionLocal()
     try:
         # Check if workshops exist
-        existing_workshops = db.query(Workshop).count()
+        existing_workshops = await db.scalar(select(func.count()).select_from(Workshop))
         if existing_workshops == 0:
             # Add default workshops
             default_workshops = [
@@ -202,59 +303,59 @@ def init_db():
                 workshop = Workshop(**workshop_data)
                 db.add(workshop)
             
-            db.commit()
+            await db.commit()
             print("Default workshops created successfully")
             
     except Exception as e:
         print(f"Error initializing database: {e}")
-        db.rollback()
+        await db.rollback()
     finally:
-        db.close()
+        await db.close()
 
 # Database utilities
-def get_vehicle_by_id(db, vehicle_id: str):
+async def get_vehicle_by_id(db, vehicle_id: str):
     """
     Get vehicle by ID
     """
-    return db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    return await db.get(Vehicle, vehicle_id)
 
-def get_vehicles(db, skip: int = 0, limit: int = 100):
+async def get_vehicles(db, skip: int = 0, limit: int = 100):
     """
     Get all vehicles with pagination
     """
-    return db.query(Vehicle).offset(skip).limit(limit).all()
+    result = await db.scalars(select(Vehicle).offset(skip).limit(limit))
+    return result.all()
 
-def create_vehicle(db, vehicle_data: dict):
+async def create_vehicle(db, vehicle_data: dict):
     """
     Create a new vehicle
     """
     vehicle = Vehicle(**vehicle_data)
     db.add(vehicle)
-    db.commit()
-    db.refresh(vehicle)
+    await db.commit()
+    await db.refresh(vehicle)
     return vehicle
 
-def update_vehicle(db, vehicle_id: str, vehicle_data: dict):
+async def update_vehicle(db, vehicle_id: str, vehicle_data: dict):
     """
     Update a vehicle
     """
-    vehicle = get_vehicle_by_id(db, vehicle_id)
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
     if vehicle:
         for key, value in vehicle_data.items():
             if value is not None:
                 setattr(vehicle, key, value)
-        vehicle.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(vehicle)
+        await db.commit()
+        await db.refresh(vehicle)
     return vehicle
 
-def delete_vehicle(db, vehicle_id: str):
+async def delete_vehicle(db, vehicle_id: str):
     """
     Delete a vehicle
     """
-    vehicle = get_vehicle_by_id(db, vehicle_id)
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
     if vehicle:
-        db.delete(vehicle)
-        db.commit()
+        await db.delete(vehicle)
+        await db.commit()
         return True
     return False 
\ No newline at end of file
@@ -0,0 +1,20 @@
+from uvicorn.workers import UvicornWorker
+import multiprocessing
+import os
+
+class UvloopWorker(UvicornWorker):
+    """Uvicorn worker pinned to the uvloop event loop and the httptools parser"""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+# Server configuration
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gunicorn_conf.UvloopWorker"
+keepalive = 5
+timeout = 60
+graceful_timeout = 30
+
+# Logging
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info")
\ No newline at end of file
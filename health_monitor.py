@@ -21,6 +21,12 @@ class HealthMonitorAgent:
             'tire_pressure': {'warning': 25, 'critical': 20},
             'fuel_level': {'warning': 15, 'critical': 5}
         }
+        
+        # Threshold vectors for scoring many vehicles at once, in scored_metrics column order;
+        # speed has no thresholds, so its column never trips a mask
+        self.scored_metrics = list(self.maintenance_thresholds) + ['speed']
+        self.warning_thresholds = np.array([t['warning'] for t in self.maintenance_thresholds.values()] + [np.inf])
+        self.critical_thresholds = np.array([t['critical'] for t in self.maintenance_thresholds.values()] + [np.inf])
         self.logger = logging.getLogger(__name__)
         
     def analyze_telemetry(self, vehicle_id: str, telemetry_data: Dict) -> Dict:
@@ -59,7 +65,7 @@ class HealthMonitorAgent:
             }
             
         except Exception as e:
-            self.logger.error(f"Error analyzing telemetry for vehicle {vehicle_id}: {str(e)}")
+            self.logger.error("Error analyzing telemetry for vehicle %s: %s", vehicle_id, e)
             return {'error': str(e)}
     
     def _detect_anomalies(self, metrics: Dict) -> List[Dict]:
@@ -150,6 +156,30 @@ class HealthMonitorAgent:
         
         return max(0, min(100, base_score))
     
+    def score_metrics(self, metrics: np.ndarray) -> np.ndarray:
+        """
+        Calculate health scores for many vehicles in one vectorized pass;
+        metrics is an (N, len(scored_metrics)) array, scoring matches _calculate_health_score
+        """
+        critical = metrics >= self.critical_thresholds
+        warning = (metrics >= self.warning_thresholds) & ~critical
+        
+        scores = 100 - 20 * critical.sum(axis=1) - 10 * warning.sum(axis=1)
+        scores -= 15 * (metrics[:, self.scored_metrics.index('fuel_level')] < 10)
+        scores -= 15 * (metrics[:, self.scored_metrics.index('engine_temp')] > 90)
+        
+        return np.clip(scores, 0, 100)
+    
+    def score_telemetry_batch(self, telemetry_batch: List[Dict]) -> np.ndarray:
+        """
+        Calculate health scores for a batch of telemetry readings
+        """
+        metrics = np.array(
+            [[telemetry.get(metric, 0) for metric in self.scored_metrics] for telemetry in telemetry_batch],
+            dtype=np.float64
+        ).reshape(-1, len(self.scored_metrics))
+        return self.score_metrics(metrics)
+    
     def _generate_alerts(self, metrics: Dict, anomalies: List[Dict]) -> List[Dict]:
         """
         Generate actionable alerts based on anomalies and metrics
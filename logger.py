@@ -1,31 +1,134 @@
+import atexit
 import logging
 import json
+import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from pathlib import Path
+import queue
 import sqlite3
+import threading
+import time
+import weakref
 from contextlib import contextmanager
 
+# Bump when the DDL in LoggerAgent._initialize_database changes
+SCHEMA_VERSION = 3
+
+_AUDIT_TRAIL_DDL = '''
+    CREATE TABLE IF NOT EXISTS audit_trail (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        action_type TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        user_id TEXT,
+        details TEXT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+_HEALTH_LOG_INSERT = '''
+    INSERT INTO health_logs 
+    (vehicle_id, health_score, payload)
+    VALUES (?, ?, ?)
+'''
+
+_BOOKING_INSERT = '''
+    INSERT INTO booking_history 
+    (booking_id, vehicle_id, workshop_id, task_type, scheduled_date, scheduled_time, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_AUDIT_EVENT_INSERT = '''
+    INSERT INTO audit_trail 
+    (action_type, entity_type, entity_id, user_id, details)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Fire-and-forget inserts handled by the background writer, keyed by table tag
+_ASYNC_INSERTS = {
+    'health_logs': _HEALTH_LOG_INSERT,
+    'audit_trail': _AUDIT_EVENT_INSERT,
+}
+
+# Audit trail queries keyed by (filter on entity_type, filter on entity_id)
+_AUDIT_TRAIL_QUERIES = {
+    (False, False): "SELECT * FROM audit_trail ORDER BY timestamp DESC LIMIT ?",
+    (True, False): "SELECT * FROM audit_trail WHERE entity_type = ? ORDER BY timestamp DESC LIMIT ?",
+    (False, True): "SELECT * FROM audit_trail WHERE entity_id = ? ORDER BY timestamp DESC LIMIT ?",
+    (True, True): "SELECT * FROM audit_trail WHERE entity_type = ? AND entity_id = ? "
+                  "ORDER BY timestamp DESC LIMIT ?",
+}
+
+# Agents whose writer may still hold queued logs. Held weakly so the exit hook
+# doesn't keep closed agents alive
+_live_agents = weakref.WeakSet()
+
+def _close_live_agents():
+    """
+    Flush every open agent's queued logs at interpreter exit; the writers are daemon
+    threads, so this also covers owners that never call close()
+    """
+    for agent in list(_live_agents):
+        agent.close()
+
+atexit.register(_close_live_agents)
+
+def _restart_live_writers():
+    """
+    Give each open agent a new writer in a forked child. Threads don't survive fork, so
+    the child starts on an empty queue; anything still queued is flushed by the parent's writer
+    """
+    for agent in list(_live_agents):
+        if not agent._closed:
+            agent._start_writer()
+
+os.register_at_fork(after_in_child=_restart_live_writers)
+
 class LoggerAgent:
     """
     AI Agent for logging maintenance history and audit trails
     """
     
-    def __init__(self, db_path: str = "maintenance_history.db"):
+    def __init__(self, db_path: str = "maintenance_history.db", batch_size: int = 128,
+                 batch_timeout: float = 0.1, audit_db_path: Optional[str] = None):
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         self._initialize_database()
         
+        # Audit trail lives in its own WAL-mode database so its frequent small writes
+        # don't contend with maintenance history; every agent instance and process
+        # appends to the same file
+        self.audit_db_path = audit_db_path or str(Path(db_path).with_suffix('')) + "_audit.db"
+        self._initialize_audit_store()
+        
+        # Background writer for fire-and-forget logs
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self._closed = False
+        self._start_writer()
+        _live_agents.add(self)
+        
     def _initialize_database(self):
         """
         Initialize SQLite database with required tables
         """
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Create maintenance history table
-                cursor.execute('''
+                # Schema is already current; skip re-running the DDL
+                if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+                    return
+                
+                # Older databases stored maintenance timestamps as ISO text
+                legacy_timestamps = any(
+                    column[1] == 'timestamp' and column[2] != 'INTEGER'
+                    for column in conn.execute("PRAGMA table_info(maintenance_history)")
+                )
+                if legacy_timestamps:
+                    conn.execute("ALTER TABLE maintenance_history RENAME TO maintenance_history_legacy")
+                
+                # Create maintenance history table (timestamp in epoch seconds)
+                conn.execute('''
                     CREATE TABLE IF NOT EXISTS maintenance_history (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         vehicle_id TEXT NOT NULL,
@@ -35,27 +138,28 @@ class LoggerAgent:
                         workshop_id TEXT,
                         cost REAL,
                         duration_hours REAL,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        timestamp INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                         status TEXT DEFAULT 'completed',
                         notes TEXT
                     )
                 ''')
                 
-                # Create audit trail table
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS audit_trail (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        action_type TEXT NOT NULL,
-                        entity_type TEXT NOT NULL,
-                        entity_id TEXT NOT NULL,
-                        user_id TEXT,
-                        details TEXT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
+                if legacy_timestamps:
+                    conn.execute('''
+                        INSERT INTO maintenance_history 
+                        (id, vehicle_id, task_type, description, performed_by, workshop_id, cost,
+                         duration_hours, timestamp, status, notes)
+                        SELECT id, vehicle_id, task_type, description, performed_by, workshop_id, cost,
+                               duration_hours,
+                               COALESCE(CAST(strftime('%s', timestamp) AS INTEGER),
+                                        CAST(strftime('%s', 'now') AS INTEGER)),
+                               status, notes
+                        FROM maintenance_history_legacy
+                    ''')
+                    conn.execute("DROP TABLE maintenance_history_legacy")
                 
                 # Create vehicle health logs table
-                cursor.execute('''
+                conn.execute('''
                     CREATE TABLE IF NOT EXISTS health_logs (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         vehicle_id TEXT NOT NULL,
@@ -63,12 +167,20 @@ class LoggerAgent:
                         anomalies TEXT,
                         alerts TEXT,
                         telemetry_data TEXT,
+                        payload TEXT,
                         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                     )
                 ''')
                 
+                # anomalies/alerts/telemetry_data are now written as one JSON payload
+                if not any(
+                    column[1] == 'payload'
+                    for column in conn.execute("PRAGMA table_info(health_logs)")
+                ):
+                    conn.execute("ALTER TABLE health_logs ADD COLUMN payload TEXT")
+                
                 # Create booking history table
-                cursor.execute('''
+                conn.execute('''
                     CREATE TABLE IF NOT EXISTS booking_history (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         booking_id TEXT UNIQUE NOT NULL,
@@ -83,11 +195,52 @@ class LoggerAgent:
                     )
                 ''')
                 
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
                 conn.commit()
                 self.logger.info("Database initialized successfully")
                 
-        except Exception as e:
-            self.logger.error(f"Error initializing database: {str(e)}")
+        except sqlite3.Error as e:
+            self.logger.error("Error initializing database: %s", e)
+    
+    def _initialize_audit_store(self):
+        """
+        Create the on-disk audit trail, carrying over an older database's audit rows on first run
+        """
+        try:
+            with self._get_audit_connection() as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                if conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'audit_trail'"
+                ).fetchone():
+                    return
+                
+                conn.execute(_AUDIT_TRAIL_DDL)
+                
+                conn.execute("ATTACH DATABASE ? AS legacy", (self.db_path,))
+                try:
+                    if conn.execute(
+                        "SELECT 1 FROM legacy.sqlite_master WHERE type = 'table' AND name = 'audit_trail'"
+                    ).fetchone():
+                        conn.execute("INSERT INTO main.audit_trail SELECT * FROM legacy.audit_trail")
+                    conn.commit()
+                finally:
+                    conn.execute("DETACH DATABASE legacy")
+                
+        except sqlite3.Error as e:
+            self.logger.error("Error initializing audit store: %s", e)
+    
+    @contextmanager
+    def _get_audit_connection(self):
+        """
+        Context manager for audit trail connections
+        """
+        conn = sqlite3.connect(self.audit_db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
     
     @contextmanager
     def _get_db_connection(self):
@@ -106,9 +259,7 @@ class LoggerAgent:
         """
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
+                cursor = conn.execute('''
                     INSERT INTO maintenance_history 
                     (vehicle_id, task_type, description, performed_by, workshop_id, cost, duration_hours, notes)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -129,15 +280,14 @@ class LoggerAgent:
                     'id': cursor.lastrowid,
                     'vehicle_id': vehicle_id,
                     'task_type': task_data.get('task_type'),
-                    'timestamp': datetime.now().isoformat(),
                     'status': 'logged'
                 }
                 
-                self.logger.info(f"Maintenance task logged for vehicle {vehicle_id}")
+                self.logger.info("Maintenance task logged for vehicle %s", vehicle_id)
                 return log_entry
                 
-        except Exception as e:
-            self.logger.error(f"Error logging maintenance task: {str(e)}")
+        except sqlite3.Error as e:
+            self.logger.error("Error logging maintenance task: %s", e)
             return {'error': str(e)}
     
     def log_health_check(self, vehicle_id: str, health_data: Dict) -> Dict:
@@ -146,19 +296,7 @@ class LoggerAgent:
         """
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO health_logs 
-                    (vehicle_id, health_score, anomalies, alerts, telemetry_data)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    vehicle_id,
-                    health_data.get('health_score', 0),
-                    json.dumps(health_data.get('anomalies', [])),
-                    json.dumps(health_data.get('alerts', [])),
-                    json.dumps(health_data.get('telemetry_data', {}))
-                ))
+                cursor = conn.execute(_HEALTH_LOG_INSERT, self._health_log_params(vehicle_id, health_data))
                 
                 conn.commit()
                 
@@ -166,15 +304,14 @@ class LoggerAgent:
                     'id': cursor.lastrowid,
                     'vehicle_id': vehicle_id,
                     'health_score': health_data.get('health_score'),
-                    'timestamp': datetime.now().isoformat(),
                     'status': 'logged'
                 }
                 
-                self.logger.info(f"Health check logged for vehicle {vehicle_id}")
+                self.logger.info("Health check logged for vehicle %s", vehicle_id)
                 return log_entry
                 
-        except Exception as e:
-            self.logger.error(f"Error logging health check: {str(e)}")
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.error("Error logging health check: %s", e)
             return {'error': str(e)}
     
     def log_booking(self, booking_data: Dict) -> Dict:
@@ -183,21 +320,7 @@ class LoggerAgent:
         """
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO booking_history 
-                    (booking_id, vehicle_id, workshop_id, task_type, scheduled_date, scheduled_time, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    booking_data.get('booking_id'),
-                    booking_data.get('vehicle_id'),
-                    booking_data.get('workshop_id'),
-                    booking_data.get('task_type'),
-                    booking_data.get('scheduled_date'),
-                    booking_data.get('scheduled_time'),
-                    booking_data.get('status', 'scheduled')
-                ))
+                cursor = conn.execute(_BOOKING_INSERT, self._booking_params(booking_data))
                 
                 conn.commit()
                 
@@ -205,15 +328,30 @@ class LoggerAgent:
                     'id': cursor.lastrowid,
                     'booking_id': booking_data.get('booking_id'),
                     'vehicle_id': booking_data.get('vehicle_id'),
-                    'timestamp': datetime.now().isoformat(),
                     'status': 'logged'
                 }
                 
-                self.logger.info(f"Booking logged: {booking_data.get('booking_id')}")
+                self.logger.info("Booking logged: %s", booking_data.get('booking_id'))
                 return log_entry
                 
-        except Exception as e:
-            self.logger.error(f"Error logging booking: {str(e)}")
+        except sqlite3.Error as e:
+            self.logger.error("Error logging booking: %s", e)
+            return {'error': str(e)}
+    
+    def log_bookings(self, bookings: List[Dict]) -> Dict:
+        """
+        Log several maintenance bookings in one transaction
+        """
+        try:
+            with self._get_db_connection() as conn:
+                conn.executemany(_BOOKING_INSERT, [self._booking_params(booking) for booking in bookings])
+                conn.commit()
+            
+            self.logger.info("%d bookings logged", len(bookings))
+            return {'logged': len(bookings), 'status': 'logged'}
+            
+        except sqlite3.Error as e:
+            self.logger.error("Error logging bookings: %s", e)
             return {'error': str(e)}
     
     def log_audit_event(self, action_type: str, entity_type: str, entity_id: str, 
@@ -222,20 +360,11 @@ class LoggerAgent:
         Log an audit trail event
         """
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    INSERT INTO audit_trail 
-                    (action_type, entity_type, entity_id, user_id, details)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    action_type,
-                    entity_type,
-                    entity_id,
-                    user_id,
-                    json.dumps(details) if details else None
-                ))
+            with self._get_audit_connection() as conn:
+                cursor = conn.execute(
+                    _AUDIT_EVENT_INSERT,
+                    self._audit_event_params(action_type, entity_type, entity_id, user_id, details)
+                )
                 
                 conn.commit()
                 
@@ -244,43 +373,181 @@ class LoggerAgent:
                     'action_type': action_type,
                     'entity_type': entity_type,
                     'entity_id': entity_id,
-                    'timestamp': datetime.now().isoformat(),
                     'status': 'logged'
                 }
                 
-                self.logger.info(f"Audit event logged: {action_type} on {entity_type} {entity_id}")
+                self.logger.info("Audit event logged: %s on %s %s", action_type, entity_type, entity_id)
                 return audit_entry
                 
-        except Exception as e:
-            self.logger.error(f"Error logging audit event: {str(e)}")
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.error("Error logging audit event: %s", e)
             return {'error': str(e)}
     
+    def log_health_check_async(self, vehicle_id: str, health_data: Dict) -> None:
+        """
+        Queue a health check for the background writer without waiting for the insert
+        """
+        self._queue.put(('health_logs', self._health_log_params(vehicle_id, health_data)))
+    
+    def log_audit_event_async(self, action_type: str, entity_type: str, entity_id: str, 
+                              user_id: Optional[str] = None, details: Optional[Dict] = None) -> None:
+        """
+        Queue an audit event for the background writer without waiting for the insert
+        """
+        self._queue.put(
+            ('audit_trail', self._audit_event_params(action_type, entity_type, entity_id, user_id, details))
+        )
+    
+    def _start_writer(self):
+        """
+        Start the background writer thread on a fresh queue
+        """
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._drain, name="logger-agent-writer", daemon=True)
+        self._writer.start()
+    
+    def close(self):
+        """
+        Flush queued logs and stop the background writer; safe to call more than once
+        """
+        if self._closed:
+            return
+        self._closed = True
+        _live_agents.discard(self)
+        self._queue.put(None)
+        self._writer.join()
+    
+    @staticmethod
+    def _health_log_params(vehicle_id: str, health_data: Dict) -> tuple:
+        """
+        Build the health_logs insert parameters
+        """
+        return (
+            vehicle_id,
+            health_data.get('health_score', 0),
+            json.dumps({
+                'anomalies': health_data.get('anomalies', []),
+                'alerts': health_data.get('alerts', []),
+                'telemetry_data': health_data.get('telemetry_data', {})
+            })
+        )
+    
+    @staticmethod
+    def _booking_params(booking_data: Dict) -> tuple:
+        """
+        Build the booking_history insert parameters
+        """
+        return (
+            booking_data.get('booking_id'),
+            booking_data.get('vehicle_id'),
+            booking_data.get('workshop_id'),
+            booking_data.get('task_type'),
+            booking_data.get('scheduled_date'),
+            booking_data.get('scheduled_time'),
+            booking_data.get('status', 'scheduled')
+        )
+    
+    @staticmethod
+    def _audit_event_params(action_type: str, entity_type: str, entity_id: str,
+                            user_id: Optional[str], details: Optional[Dict]) -> tuple:
+        """
+        Build the audit_trail insert parameters
+        """
+        # Most audit events carry no details; skip the encoder entirely for those
+        return (
+            action_type,
+            entity_type,
+            entity_id,
+            user_id,
+            json.dumps(details) if details else None
+        )
+    
+    def _drain(self):
+        """
+        Writer thread loop: collect queued logs into batches and insert each batch in one transaction
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            batch = [item]
+            stopping = False
+            deadline = time.monotonic() + self.batch_timeout
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._write_batch(batch)
+            
+            if stopping:
+                return
+    
+    def _write_batch(self, batch: List[tuple]):
+        """
+        Insert a batch of queued logs with one executemany per table
+        """
+        grouped = {}
+        for table, params in batch:
+            grouped.setdefault(table, []).append(params)
+        
+        try:
+            audit_rows = grouped.pop('audit_trail', None)
+            if audit_rows:
+                with self._get_audit_connection() as conn:
+                    conn.executemany(_AUDIT_EVENT_INSERT, audit_rows)
+                    conn.commit()
+            
+            if grouped:
+                with self._get_db_connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for table, rows in grouped.items():
+                        conn.executemany(_ASYNC_INSERTS[table], rows)
+                    conn.commit()
+                
+        except sqlite3.Error as e:
+            self.logger.error("Error writing queued log batch of %d entries: %s", len(batch), e)
+    
+    def _iter_rows(self, query: str, params: Iterable, connection=None) -> Iterator[Dict]:
+        """
+        Yield result rows as dicts straight off the cursor without materializing them;
+        connection is the connection context manager to read through, the main database by default
+        """
+        with (connection or self._get_db_connection)() as conn:
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute(query, params):
+                yield dict(row)
+    
+    def get_maintenance_history_iter(self, vehicle_id: str, limit: int = 50) -> Iterator[Dict]:
+        """
+        Stream maintenance history for a vehicle
+        """
+        return self._iter_rows('''
+            SELECT * FROM maintenance_history 
+            WHERE vehicle_id = ? 
+            ORDER BY timestamp DESC 
+            LIMIT ?
+        ''', (vehicle_id, limit))
+    
     def get_maintenance_history(self, vehicle_id: str, limit: int = 50) -> List[Dict]:
         """
         Get maintenance history for a vehicle
         """
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
+            return list(self.get_maintenance_history_iter(vehicle_id, limit))
                 
-                cursor.execute('''
-                    SELECT * FROM maintenance_history 
-                    WHERE vehicle_id = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                ''', (vehicle_id, limit))
-                
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                history = []
-                for row in rows:
-                    history.append(dict(zip(columns, row)))
-                
-                return history
-                
-        except Exception as e:
-            self.logger.error(f"Error retrieving maintenance history: {str(e)}")
+        except sqlite3.Error as e:
+            self.logger.error("Error retrieving maintenance history: %s", e)
             return []
     
     def get_health_logs(self, vehicle_id: str, limit: int = 50) -> List[Dict]:
@@ -289,9 +556,7 @@ class LoggerAgent:
         """
         try:
             with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
+                cursor = conn.execute('''
                     SELECT * FROM health_logs 
                     WHERE vehicle_id = ? 
                     ORDER BY timestamp DESC 
@@ -304,88 +569,68 @@ class LoggerAgent:
                 logs = []
                 for row in rows:
                     log_entry = dict(zip(columns, row))
-                    # Parse JSON fields
-                    if log_entry.get('anomalies'):
-                        log_entry['anomalies'] = json.loads(log_entry['anomalies'])
-                    if log_entry.get('alerts'):
-                        log_entry['alerts'] = json.loads(log_entry['alerts'])
-                    if log_entry.get('telemetry_data'):
-                        log_entry['telemetry_data'] = json.loads(log_entry['telemetry_data'])
+                    payload = log_entry.pop('payload')
+                    if payload:
+                        log_entry.update(json.loads(payload))
+                    else:
+                        # Rows written before the payload column; empty lists were stored as NULL
+                        log_entry['anomalies'] = json.loads(log_entry['anomalies']) if log_entry['anomalies'] else []
+                        log_entry['alerts'] = json.loads(log_entry['alerts']) if log_entry['alerts'] else []
+                        if log_entry.get('telemetry_data'):
+                            log_entry['telemetry_data'] = json.loads(log_entry['telemetry_data'])
                     logs.append(log_entry)
                 
                 return logs
                 
-        except Exception as e:
-            self.logger.error(f"Error retrieving health logs: {str(e)}")
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.error("Error retrieving health logs: %s", e)
             return []
     
+    def get_booking_history_iter(self, vehicle_id: str, limit: int = 50) -> Iterator[Dict]:
+        """
+        Stream booking history for a vehicle
+        """
+        return self._iter_rows('''
+            SELECT * FROM booking_history 
+            WHERE vehicle_id = ? 
+            ORDER BY created_at DESC 
+            LIMIT ?
+        ''', (vehicle_id, limit))
+    
     def get_booking_history(self, vehicle_id: str, limit: int = 50) -> List[Dict]:
         """
         Get booking history for a vehicle
         """
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
+            return list(self.get_booking_history_iter(vehicle_id, limit))
                 
-                cursor.execute('''
-                    SELECT * FROM booking_history 
-                    WHERE vehicle_id = ? 
-                    ORDER BY created_at DESC 
-                    LIMIT ?
-                ''', (vehicle_id, limit))
-                
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                bookings = []
-                for row in rows:
-                    bookings.append(dict(zip(columns, row)))
-                
-                return bookings
-                
-        except Exception as e:
-            self.logger.error(f"Error retrieving booking history: {str(e)}")
+        except sqlite3.Error as e:
+            self.logger.error("Error retrieving booking history: %s", e)
             return []
     
+    def get_audit_trail_iter(self, entity_type: Optional[str] = None, entity_id: Optional[str] = None, 
+                             limit: int = 100) -> Iterator[Dict]:
+        """
+        Stream audit trail entries
+        """
+        query = _AUDIT_TRAIL_QUERIES[(bool(entity_type), bool(entity_id))]
+        params = tuple(p for p in (entity_type, entity_id) if p) + (limit,)
+        
+        for audit_entry in self._iter_rows(query, params, self._get_audit_connection):
+            if audit_entry.get('details'):
+                audit_entry['details'] = json.loads(audit_entry['details'])
+            yield audit_entry
+    
     def get_audit_trail(self, entity_type: Optional[str] = None, entity_id: Optional[str] = None, 
                         limit: int = 100) -> List[Dict]:
         """
         Get audit trail entries
         """
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = "SELECT * FROM audit_trail WHERE 1=1"
-                params = []
-                
-                if entity_type:
-                    query += " AND entity_type = ?"
-                    params.append(entity_type)
-                
-                if entity_id:
-                    query += " AND entity_id = ?"
-                    params.append(entity_id)
-                
-                query += " ORDER BY timestamp DESC LIMIT ?"
-                params.append(limit)
-                
-                cursor.execute(query, params)
-                
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                audit_entries = []
-                for row in rows:
-                    audit_entry = dict(zip(columns, row))
-                    if audit_entry.get('details'):
-                        audit_entry['details'] = json.loads(audit_entry['details'])
-                    audit_entries.append(audit_entry)
-                
-                return audit_entries
+            return list(self.get_audit_trail_iter(entity_type, entity_id, limit))
                 
-        except Exception as e:
-            self.logger.error(f"Error retrieving audit trail: {str(e)}")
+        except (sqlite3.Error, ValueError) as e:
+            self.logger.error("Error retrieving audit trail: %s", e)
             return []
     
     def export_maintenance_report(self, vehicle_id: str, start_date: str, end_date: str) -> Dict:
@@ -393,41 +638,34 @@ class LoggerAgent:
         Export maintenance report for a vehicle
         """
         try:
-            with self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT * FROM maintenance_history 
-                    WHERE vehicle_id = ? AND timestamp BETWEEN ? AND ?
-                    ORDER BY timestamp DESC
-                ''', (vehicle_id, start_date, end_date))
-                
-                rows = cursor.fetchall()
-                columns = [description[0] for description in cursor.description]
-                
-                maintenance_entries = []
-                total_cost = 0.0
-                total_duration = 0.0
-                
-                for row in rows:
-                    entry = dict(zip(columns, row))
-                    maintenance_entries.append(entry)
-                    total_cost += entry.get('cost', 0.0)
-                    total_duration += entry.get('duration_hours', 0.0)
-                
-                report = {
-                    'vehicle_id': vehicle_id,
-                    'start_date': start_date,
-                    'end_date': end_date,
-                    'total_entries': len(maintenance_entries),
-                    'total_cost': total_cost,
-                    'total_duration': total_duration,
-                    'maintenance_entries': maintenance_entries,
-                    'generated_at': datetime.now().isoformat()
-                }
-                
-                return report
-                
-        except Exception as e:
-            self.logger.error(f"Error generating maintenance report: {str(e)}")
+            maintenance_entries = []
+            total_cost = 0.0
+            total_duration = 0.0
+            
+            for entry in self._iter_rows('''
+                SELECT * FROM maintenance_history 
+                WHERE vehicle_id = ?
+                  AND timestamp BETWEEN CAST(strftime('%s', ?) AS INTEGER)
+                                    AND CAST(strftime('%s', ?) AS INTEGER)
+                ORDER BY timestamp DESC
+            ''', (vehicle_id, start_date, end_date)):
+                maintenance_entries.append(entry)
+                total_cost += entry['cost'] or 0.0
+                total_duration += entry['duration_hours'] or 0.0
+            
+            report = {
+                'vehicle_id': vehicle_id,
+                'start_date': start_date,
+                'end_date': end_date,
+                'total_entries': len(maintenance_entries),
+                'total_cost': total_cost,
+                'total_duration': total_duration,
+                'maintenance_entries': maintenance_entries,
+                'generated_at': datetime.now().isoformat()
+            }
+            
+            return report
+                
+        except sqlite3.Error as e:
+            self.logger.error("Error generating maintenance report: %s", e)
             return {'error': str(e)} 
\ No newline at end of file
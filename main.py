@@ -1,11 +1,21 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from cachetools import TTLCache
 from typing import List, Optional, Dict, Any
 import asyncio
+import hashlib
 import logging
+import orjson
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-from .database import get_db, init_db
+from .database import SessionLocal, get_db, init_db
 from .models import (
     Vehicle, VehicleCreate, VehicleUpdate, TelemetryData, HealthAnalysis,
     MaintenanceTask, MaintenanceTaskCreate, Booking, BookingCreate, BookingUpdate,
@@ -13,51 +23,177 @@ from .models import (
     BookingResponse, FleetReportResponse, ErrorResponse
 )
 from .crud import (
-    get_vehicles, get_vehicle, create_vehicle, update_vehicle, delete_vehicle,
-    create_telemetry_record, get_telemetry_history, get_latest_telemetry,
-    create_health_analysis, get_health_history, get_latest_health_analysis,
+    get_vehicles, get_vehicle, get_vehicle_updated_at, get_vehicles_by_status, create_vehicle, update_vehicle, delete_vehicle,
+    create_telemetry_records, stream_telemetry_history, get_latest_telemetry,
+    create_health_analysis, stream_health_history, get_latest_health_analysis,
     create_maintenance_task, get_maintenance_tasks, update_maintenance_task,
     create_booking, get_bookings, get_booking, update_booking, cancel_booking,
     get_workshops, get_workshop, get_workshops_by_service,
-    create_alert, get_alerts, mark_alert_read,
-    get_fleet_summary, get_maintenance_cost_summary, get_vehicle_analytics
+    create_alert, get_alerts, get_alerts_version, mark_alert_read,
+    get_fleet_summary, get_maintenance_cost_summary, get_vehicle_analytics, get_system_status
 )
-from ..agents.orchestrator import OrchestratorAgent
-from ..agents.health_monitor import HealthMonitorAgent
-from ..agents.planner import PlannerAgent
-from ..agents.communicator import CommunicatorAgent
-from ..agents.logger import LoggerAgent
+from .tasks import (
+    process_telemetry_task, process_telemetry_batch_task, schedule_maintenance_task,
+    generate_fleet_report_task, handle_emergency_task
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize database
+    await init_db()
+    flusher = asyncio.create_task(telemetry_flusher())
+    yield
+    # Write out telemetry still waiting in the queue before stopping
+    await telemetry_queue.join()
+    flusher.cancel()
+    log_listener.stop()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Rental Fleet Dashboard API",
     description="AI-powered rental fleet management system with predictive maintenance",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Allowed browser origins, comma separated; defaults to the dashboard dev server
+CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify actual origins
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    max_age=600,  # Let browsers cache preflight responses
 )
 
-# Initialize agents
-orchestrator = OrchestratorAgent()
-health_monitor = HealthMonitorAgent()
-planner = PlannerAgent()
-communicator = CommunicatorAgent()
-logger_agent = LoggerAgent()
-
-# Initialize database
-init_db()
+# Compress larger responses (telemetry history, reports)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records go through a queue and are written by a listener
+# thread, so handler I/O never blocks the event loop
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+log_listener.start()
 logger = logging.getLogger(__name__)
 
+# Telemetry is buffered and written in bulk: a flush happens at TELEMETRY_FLUSH_SIZE
+# items or TELEMETRY_FLUSH_INTERVAL seconds after the first queued item. Each item
+# carries a future that resolves once its row is stored, so requests are only
+# acknowledged for persisted telemetry
+TELEMETRY_QUEUE_SIZE = 10_000
+TELEMETRY_FLUSH_SIZE = 500
+TELEMETRY_FLUSH_INTERVAL = 0.05
+telemetry_queue: asyncio.Queue = asyncio.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+telemetry_write_failures = 0
+
+def resolve_write(written: asyncio.Future, error: Optional[Exception] = None):
+    """Report a telemetry write outcome to its request, unless the client already went away"""
+    if written.done():
+        return
+    if error is None:
+        written.set_result(None)
+    else:
+        written.set_exception(error)
+
+async def write_telemetry_batch(batch: List[tuple]):
+    """Bulk insert a batch, falling back to row-by-row inserts so one bad row fails only its own request"""
+    global telemetry_write_failures
+    try:
+        async with SessionLocal() as db:
+            await create_telemetry_records(db, [row for row, _ in batch])
+    except Exception as e:
+        logger.warning("Bulk write of %s telemetry records failed, retrying row by row: %s", len(batch), e)
+    else:
+        for _, written in batch:
+            resolve_write(written)
+        return
+    
+    async with SessionLocal() as db:
+        for row, written in batch:
+            try:
+                await create_telemetry_records(db, [row])
+            except Exception as e:
+                await db.rollback()
+                telemetry_write_failures += 1
+                logger.error("Error writing telemetry for vehicle %s (%s failed so far): %s",
+                             row.get('vehicle_id'), telemetry_write_failures, e)
+                resolve_write(written, e)
+            else:
+                resolve_write(written)
+
+async def telemetry_flusher():
+    """Drain the telemetry queue into the database in bulk inserts"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await telemetry_queue.get()]
+        deadline = loop.time() + TELEMETRY_FLUSH_INTERVAL
+        while len(batch) < TELEMETRY_FLUSH_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(telemetry_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        
+        try:
+            await write_telemetry_batch(batch)
+        except Exception as e:
+            logger.error("Error writing %s telemetry records: %s", len(batch), e)
+            for _, written in batch:
+                resolve_write(written, e)
+        finally:
+            for _ in batch:
+                telemetry_queue.task_done()
+
+def rows_response(records, model) -> ORJSONResponse:
+    """Serialize trusted database rows for a response model without re-validating them"""
+    fields = list(model.model_fields)
+    return ORJSONResponse([{field: getattr(record, field) for field in fields} for record in records])
+
+# Fleet-wide results are computed once for all concurrent callers and reused
+# for FLEET_RESULT_TTL seconds
+FLEET_RESULT_TTL = 30
+fleet_inflight: Dict[tuple, asyncio.Task] = {}
+fleet_results = TTLCache(maxsize=128, ttl=FLEET_RESULT_TTL)
+
+async def single_flight(key: tuple, compute):
+    """Return a recent result for key, or join the in-flight computation instead of starting another"""
+    if key in fleet_results:
+        return fleet_results[key]
+    
+    task = fleet_inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(compute())
+        fleet_inflight[key] = task
+        task.add_done_callback(lambda _: fleet_inflight.pop(key, None))
+    
+    # Shielded so one caller disconnecting does not cancel the work for the others
+    result = await asyncio.shield(task)
+    fleet_results[key] = result
+    return result
+
+def make_etag(data: bytes) -> str:
+    """Build a strong ETag from the bytes that identify a representation"""
+    return f'"{hashlib.sha1(data).hexdigest()}"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Return a 304 response when the client already holds this ETag"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def etag_response(request: Request, content: Any) -> Response:
+    """Serialize content and tag it with a hash of the body, or answer 304 if unchanged"""
+    body = orjson.dumps(content)
+    etag = make_etag(body)
+    return not_modified(request, etag) or Response(body, media_type="application/json", headers={"ETag": etag})
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -66,9 +202,10 @@ async def health_check():
 
 # System status endpoint
 @app.get("/system/status", response_model=SystemStatus)
-async def get_system_status():
+async def get_system_status_endpoint(db: AsyncSession = Depends(get_db)):
     """Get current system status"""
-    return orchestrator.get_system_status()
+    # Agents run on the workers, so status comes from the shared database
+    return await get_system_status(db)
 
 # Vehicle endpoints
 @app.get("/vehicles", response_model=List[Vehicle])
@@ -76,129 +213,158 @@ async def read_vehicles(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all vehicles with optional filtering"""
     if status:
-        vehicles = get_vehicles_by_status(db, status)
+        vehicles = await get_vehicles_by_status(db, status)
     else:
-        vehicles = get_vehicles(db, skip=skip, limit=limit)
-    return vehicles
+        vehicles = await get_vehicles(db, skip=skip, limit=limit)
+    return rows_response(vehicles, Vehicle)
 
 @app.get("/vehicles/{vehicle_id}", response_model=Vehicle)
-async def read_vehicle(vehicle_id: str, db: Session = Depends(get_db)):
+async def read_vehicle(
+    vehicle_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     """Get a specific vehicle by ID"""
-    vehicle = get_vehicle(db, vehicle_id)
+    # Check the client's copy against updated_at before loading the full row
+    updated_at = await get_vehicle_updated_at(db, vehicle_id)
+    if updated_at is not None:
+        etag = make_etag(f"{vehicle_id}:{updated_at.isoformat()}".encode())
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        response.headers["ETag"] = etag
+    
+    vehicle = await get_vehicle(db, vehicle_id)
     if vehicle is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
 
 @app.post("/vehicles", response_model=Vehicle)
-async def create_new_vehicle(vehicle: VehicleCreate, db: Session = Depends(get_db)):
+async def create_new_vehicle(vehicle: VehicleCreate, db: AsyncSession = Depends(get_db)):
     """Create a new vehicle"""
-    db_vehicle = get_vehicle(db, vehicle.id)
+    db_vehicle = await get_vehicle(db, vehicle.id)
     if db_vehicle:
         raise HTTPException(status_code=400, detail="Vehicle ID already registered")
-    return create_vehicle(db, vehicle)
+    return await create_vehicle(db, vehicle)
 
 @app.put("/vehicles/{vehicle_id}", response_model=Vehicle)
 async def update_existing_vehicle(
     vehicle_id: str,
     vehicle_update: VehicleUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a vehicle"""
-    vehicle = update_vehicle(db, vehicle_id, vehicle_update)
+    vehicle = await update_vehicle(db, vehicle_id, vehicle_update.model_dump(mode="json", exclude_unset=True))
     if vehicle is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return vehicle
 
 @app.delete("/vehicles/{vehicle_id}")
-async def delete_existing_vehicle(vehicle_id: str, db: Session = Depends(get_db)):
+async def delete_existing_vehicle(vehicle_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a vehicle"""
-    success = delete_vehicle(db, vehicle_id)
+    success = await delete_vehicle(db, vehicle_id)
     if not success:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return {"message": "Vehicle deleted successfully"}
 
 # Telemetry endpoints
 @app.post("/telemetry")
-async def submit_telemetry(
-    telemetry_data: TelemetryData,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+async def submit_telemetry(telemetry_data: TelemetryData):
     """Submit vehicle telemetry data"""
+    # Dump once: the same row feeds the bulk write and the worker
+    telemetry_row = telemetry_data.model_dump()
+    
+    # Queue telemetry for the next bulk write; shed load rather than hold requests open when saturated
+    written = asyncio.get_running_loop().create_future()
+    try:
+        telemetry_queue.put_nowait((telemetry_row, written))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Telemetry queue is full, retry later")
+    
     try:
-        # Store telemetry in database
-        telemetry_record = create_telemetry_record(db, telemetry_data)
+        # Acknowledge and process only telemetry that was stored
+        await written
         
-        # Process telemetry with AI agents in background
-        background_tasks.add_task(
-            process_telemetry_background,
-            telemetry_data.vehicle_id,
-            telemetry_data.dict(),
-            db
-        )
+        # Process telemetry with AI agents on a worker; publishing does blocking
+        # broker I/O, so it runs off the event loop
+        await run_in_threadpool(process_telemetry_task.delay, telemetry_data.vehicle_id, telemetry_row)
         
         return {
             "success": True,
-            "message": "Telemetry data received and processing started",
-            "telemetry_id": telemetry_record.id
+            "message": "Telemetry data received and processing started"
         }
     except Exception as e:
-        logger.error(f"Error processing telemetry: {str(e)}")
+        logger.error("Error processing telemetry: %s", e)
         raise HTTPException(status_code=500, detail="Error processing telemetry")
 
-async def process_telemetry_background(vehicle_id: str, telemetry_data: Dict, db: Session):
-    """Background task to process telemetry with AI agents"""
+@app.post("/telemetry/batch")
+async def submit_telemetry_batch(
+    telemetry_items: List[TelemetryData],
+    db: AsyncSession = Depends(get_db)
+):
+    """Submit telemetry data for several vehicles in one request"""
     try:
-        # Process with orchestrator
-        result = await orchestrator.process_vehicle_telemetry(vehicle_id, telemetry_data)
+        telemetry_rows = [item.model_dump() for item in telemetry_items]
         
-        # Update vehicle health score in database
-        if 'health_score' in result:
-            update_vehicle(db, vehicle_id, {'health_score': result['health_score']})
+        # Store the whole batch with one bulk insert
+        stored = await create_telemetry_records(db, telemetry_rows)
         
-        logger.info(f"Telemetry processed for vehicle {vehicle_id}: {result}")
+        # Process telemetry with AI agents on a worker
+        await run_in_threadpool(process_telemetry_batch_task.delay, telemetry_rows)
         
+        return {
+            "success": True,
+            "message": "Telemetry batch received and processing started",
+            "telemetry_count": stored
+        }
     except Exception as e:
-        logger.error(f"Error in background telemetry processing: {str(e)}")
+        logger.error("Error processing telemetry batch: %s", e)
+        raise HTTPException(status_code=500, detail="Error processing telemetry batch")
+
+def stream_ndjson(stream_records, vehicle_id: str, limit: int) -> StreamingResponse:
+    """Stream history rows as newline-delimited JSON from a session owned by the response"""
+    async def generate():
+        async with SessionLocal() as db:
+            async for record in stream_records(db, vehicle_id, limit):
+                row = {column.key: getattr(record, column.key) for column in record.__table__.columns}
+                yield orjson.dumps(row) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 @app.get("/vehicles/{vehicle_id}/telemetry")
-async def get_vehicle_telemetry(
-    vehicle_id: str,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
+async def get_vehicle_telemetry(vehicle_id: str, limit: int = 100):
     """Get telemetry history for a vehicle"""
-    telemetry_records = get_telemetry_history(db, vehicle_id, limit)
-    return telemetry_records
+    return stream_ndjson(stream_telemetry_history, vehicle_id, limit)
 
 @app.get("/vehicles/{vehicle_id}/telemetry/latest")
-async def get_latest_vehicle_telemetry(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_latest_vehicle_telemetry(vehicle_id: str, db: AsyncSession = Depends(get_db)):
     """Get latest telemetry for a vehicle"""
-    telemetry = get_latest_telemetry(db, vehicle_id)
+    telemetry = await get_latest_telemetry(db, vehicle_id)
     if telemetry is None:
         raise HTTPException(status_code=404, detail="No telemetry data found")
     return telemetry
 
 # Health analysis endpoints
 @app.get("/vehicles/{vehicle_id}/health", response_model=HealthAnalysisResponse)
-async def get_vehicle_health(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_vehicle_health(vehicle_id: str, db: AsyncSession = Depends(get_db)):
     """Get latest health analysis for a vehicle"""
-    health_analysis = get_latest_health_analysis(db, vehicle_id)
+    health_analysis = await get_latest_health_analysis(db, vehicle_id)
     if health_analysis is None:
         raise HTTPException(status_code=404, detail="No health analysis found")
     
-    # Parse JSON fields
+    # JSON columns come back as Python lists
     health_data = {
         "vehicle_id": health_analysis.vehicle_id,
         "health_score": health_analysis.health_score,
-        "anomalies": json.loads(health_analysis.anomalies) if health_analysis.anomalies else [],
-        "maintenance_predictions": json.loads(health_analysis.maintenance_predictions) if health_analysis.maintenance_predictions else [],
-        "alerts": json.loads(health_analysis.alerts) if health_analysis.alerts else [],
-        "recommendations": json.loads(health_analysis.recommendations) if health_analysis.recommendations else [],
+        "anomalies": health_analysis.anomalies or [],
+        "maintenance_predictions": health_analysis.maintenance_predictions or [],
+        "alerts": health_analysis.alerts or [],
+        "recommendations": health_analysis.recommendations or [],
         "timestamp": health_analysis.timestamp
     }
     
@@ -209,33 +375,26 @@ async def get_vehicle_health(vehicle_id: str, db: Session = Depends(get_db)):
     )
 
 @app.get("/vehicles/{vehicle_id}/health/history")
-async def get_vehicle_health_history(
-    vehicle_id: str,
-    limit: int = 50,
-    db: Session = Depends(get_db)
-):
+async def get_vehicle_health_history(vehicle_id: str, limit: int = 50):
     """Get health analysis history for a vehicle"""
-    health_records = get_health_history(db, vehicle_id, limit)
-    return health_records
+    return stream_ndjson(stream_health_history, vehicle_id, limit)
 
 # Maintenance endpoints
 @app.post("/maintenance/tasks")
 async def create_maintenance_task_endpoint(
     task: MaintenanceTaskCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new maintenance task"""
     try:
-        task_data = task.dict()
-        db_task = create_maintenance_task(db, task_data)
+        task_data = task.model_dump()
+        db_task = await create_maintenance_task(db, task_data)
         
-        # Schedule maintenance in background
-        background_tasks.add_task(
-            schedule_maintenance_background,
+        # Schedule maintenance on a worker
+        await run_in_threadpool(
+            schedule_maintenance_task.delay,
             task.vehicle_id,
-            [task_data],
-            db
+            [task.model_dump(mode="json")]
         )
         
         return {
@@ -244,35 +403,27 @@ async def create_maintenance_task_endpoint(
             "task_id": db_task.id
         }
     except Exception as e:
-        logger.error(f"Error creating maintenance task: {str(e)}")
+        logger.error("Error creating maintenance task: %s", e)
         raise HTTPException(status_code=500, detail="Error creating maintenance task")
 
-async def schedule_maintenance_background(vehicle_id: str, tasks: List[Dict], db: Session):
-    """Background task to schedule maintenance"""
-    try:
-        result = await orchestrator.schedule_maintenance_workflow(vehicle_id, tasks)
-        logger.info(f"Maintenance scheduled for vehicle {vehicle_id}: {result}")
-    except Exception as e:
-        logger.error(f"Error scheduling maintenance: {str(e)}")
-
 @app.get("/maintenance/tasks")
 async def get_maintenance_tasks_endpoint(
     vehicle_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get maintenance tasks with optional filtering"""
-    tasks = get_maintenance_tasks(db, vehicle_id=vehicle_id, status=status)
+    tasks = await get_maintenance_tasks(db, vehicle_id=vehicle_id, status=status)
     return tasks
 
 @app.put("/maintenance/tasks/{task_id}")
 async def update_maintenance_task_endpoint(
     task_id: int,
     task_update: Dict[str, Any],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a maintenance task"""
-    task = update_maintenance_task(db, task_id, task_update)
+    task = await update_maintenance_task(db, task_id, task_update)
     if task is None:
         raise HTTPException(status_code=404, detail="Maintenance task not found")
     return task
@@ -281,43 +432,40 @@ async def update_maintenance_task_endpoint(
 @app.post("/bookings", response_model=BookingResponse)
 async def create_booking_endpoint(
     booking: BookingCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new maintenance booking"""
     try:
-        booking_data = booking.dict()
-        booking_data['booking_id'] = f"booking_{int(datetime.now().timestamp())}"
-        
-        # Get workshop name
-        workshop = get_workshop(db, booking.workshop_id)
-        if workshop:
-            booking_data['workshop_name'] = workshop.name
-        
-        db_booking = create_booking(db, booking_data)
-        
-        return BookingResponse(
-            success=True,
-            data=db_booking,
-            message="Booking created successfully"
-        )
+        booking_data = booking.model_dump(mode="json")
+        # Booking ID and workshop name are filled in by the insert itself
+        db_booking = await create_booking(db, booking_data)
     except Exception as e:
-        logger.error(f"Error creating booking: {str(e)}")
+        logger.error("Error creating booking: %s", e)
         raise HTTPException(status_code=500, detail="Error creating booking")
+    
+    if db_booking is None:
+        raise HTTPException(status_code=404, detail="Workshop not found")
+    
+    return BookingResponse(
+        success=True,
+        data=db_booking,
+        message="Booking created successfully"
+    )
 
 @app.get("/bookings", response_model=List[Booking])
 async def get_bookings_endpoint(
     vehicle_id: Optional[str] = None,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get bookings with optional filtering"""
-    bookings = get_bookings(db, vehicle_id=vehicle_id, status=status)
-    return bookings
+    bookings = await get_bookings(db, vehicle_id=vehicle_id, status=status)
+    return rows_response(bookings, Booking)
 
 @app.get("/bookings/{booking_id}", response_model=Booking)
-async def get_booking_endpoint(booking_id: str, db: Session = Depends(get_db)):
+async def get_booking_endpoint(booking_id: str, db: AsyncSession = Depends(get_db)):
     """Get a specific booking by ID"""
-    booking = get_booking(db, booking_id)
+    booking = await get_booking(db, booking_id)
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
     return booking
@@ -326,73 +474,87 @@ async def get_booking_endpoint(booking_id: str, db: Session = Depends(get_db)):
 async def update_booking_endpoint(
     booking_id: str,
     booking_update: BookingUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a booking"""
-    booking = update_booking(db, booking_id, booking_update.dict(exclude_unset=True))
+    booking = await update_booking(db, booking_id, booking_update.model_dump(mode="json", exclude_unset=True))
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
     return booking
 
 @app.delete("/bookings/{booking_id}")
-async def cancel_booking_endpoint(booking_id: str, db: Session = Depends(get_db)):
+async def cancel_booking_endpoint(booking_id: str, db: AsyncSession = Depends(get_db)):
     """Cancel a booking"""
-    booking = cancel_booking(db, booking_id)
+    booking = await cancel_booking(db, booking_id)
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
     return {"message": "Booking cancelled successfully"}
 
 # Workshop endpoints
 @app.get("/workshops", response_model=List[Workshop])
-async def get_workshops_endpoint(db: Session = Depends(get_db)):
+async def get_workshops_endpoint(request: Request, db: AsyncSession = Depends(get_db)):
     """Get all workshops"""
-    workshops = get_workshops(db)
-    return workshops
+    workshops = await get_workshops(db)
+    return etag_response(request, workshops)
 
 @app.get("/workshops/{workshop_id}", response_model=Workshop)
-async def get_workshop_endpoint(workshop_id: str, db: Session = Depends(get_db)):
+async def get_workshop_endpoint(workshop_id: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Get a specific workshop by ID"""
-    workshop = get_workshop(db, workshop_id)
+    workshop = await get_workshop(db, workshop_id)
     if workshop is None:
         raise HTTPException(status_code=404, detail="Workshop not found")
-    return workshop
+    return etag_response(request, workshop)
 
 @app.get("/workshops/service/{service}")
-async def get_workshops_by_service_endpoint(service: str, db: Session = Depends(get_db)):
+async def get_workshops_by_service_endpoint(service: str, request: Request, db: AsyncSession = Depends(get_db)):
     """Get workshops that provide a specific service"""
-    workshops = get_workshops_by_service(db, service)
-    return workshops
+    workshops = await get_workshops_by_service(db, service)
+    return etag_response(request, workshops)
 
 # Alert endpoints
 @app.get("/alerts")
 async def get_alerts_endpoint(
+    request: Request,
+    response: Response,
     vehicle_id: Optional[str] = None,
     unread_only: bool = False,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get alerts with optional filtering"""
-    alerts = get_alerts(db, vehicle_id=vehicle_id, unread_only=unread_only)
+    # Alerts are only ever added or marked read, so count, newest ID and read count identify the list
+    version = await get_alerts_version(db, vehicle_id=vehicle_id, unread_only=unread_only)
+    etag = make_etag(f"{vehicle_id}:{unread_only}:{version}".encode())
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers["ETag"] = etag
+    
+    alerts = await get_alerts(db, vehicle_id=vehicle_id, unread_only=unread_only)
     return alerts
 
 @app.put("/alerts/{alert_id}/read")
-async def mark_alert_read_endpoint(alert_id: str, db: Session = Depends(get_db)):
+async def mark_alert_read_endpoint(alert_id: str, db: AsyncSession = Depends(get_db)):
     """Mark an alert as read"""
-    alert = mark_alert_read(db, alert_id)
+    alert = await mark_alert_read(db, alert_id)
     if alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
     return {"message": "Alert marked as read"}
 
 # Analytics and reporting endpoints
 @app.get("/analytics/fleet")
-async def get_fleet_analytics(db: Session = Depends(get_db)):
+async def get_fleet_analytics():
     """Get fleet analytics and summary"""
-    summary = get_fleet_summary(db)
-    return summary
+    async def compute():
+        # Own session: the computation may outlive the request that started it
+        async with SessionLocal() as db:
+            return await get_fleet_summary(db)
+    
+    return await single_flight(("analytics",), compute)
 
 @app.get("/analytics/vehicles/{vehicle_id}")
-async def get_vehicle_analytics_endpoint(vehicle_id: str, db: Session = Depends(get_db)):
+async def get_vehicle_analytics_endpoint(vehicle_id: str, db: AsyncSession = Depends(get_db)):
     """Get analytics for a specific vehicle"""
-    analytics = get_vehicle_analytics(db, vehicle_id)
+    analytics = await get_vehicle_analytics(db, vehicle_id)
     if not analytics:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     return analytics
@@ -400,17 +562,16 @@ async def get_vehicle_analytics_endpoint(vehicle_id: str, db: Session = Depends(
 @app.get("/reports/fleet", response_model=FleetReportResponse)
 async def generate_fleet_report(
     start_date: str,
-    end_date: str,
-    background_tasks: BackgroundTasks
+    end_date: str
 ):
     """Generate comprehensive fleet report"""
     try:
-        # Generate report in background
-        background_tasks.add_task(
-            generate_fleet_report_background,
-            start_date,
-            end_date
-        )
+        # Generate report on a worker, once per period while a recent run is pending
+        async def enqueue():
+            result = await run_in_threadpool(generate_fleet_report_task.delay, start_date, end_date)
+            return result.id
+        
+        await single_flight(("report", start_date, end_date), enqueue)
         
         return FleetReportResponse(
             success=True,
@@ -424,29 +585,20 @@ async def generate_fleet_report(
             message="Fleet report generation started"
         )
     except Exception as e:
-        logger.error(f"Error generating fleet report: {str(e)}")
+        logger.error("Error generating fleet report: %s", e)
         raise HTTPException(status_code=500, detail="Error generating fleet report")
 
-async def generate_fleet_report_background(start_date: str, end_date: str):
-    """Background task to generate fleet report"""
-    try:
-        report = await orchestrator.generate_fleet_report(start_date, end_date)
-        logger.info(f"Fleet report generated: {report}")
-    except Exception as e:
-        logger.error(f"Error generating fleet report: {str(e)}")
-
 # Emergency endpoints
 @app.post("/emergency")
 async def handle_emergency_endpoint(
     vehicle_id: str,
-    emergency_data: Dict[str, Any],
-    background_tasks: BackgroundTasks
+    emergency_data: Dict[str, Any]
 ):
     """Handle emergency situation"""
     try:
-        # Process emergency in background
-        background_tasks.add_task(
-            handle_emergency_background,
+        # Process emergency on a worker
+        await run_in_threadpool(
+            handle_emergency_task.delay,
             vehicle_id,
             emergency_data
         )
@@ -457,16 +609,5 @@ async def handle_emergency_endpoint(
             "vehicle_id": vehicle_id
         }
     except Exception as e:
-        logger.error(f"Error handling emergency: {str(e)}")
-        raise HTTPException(status_code=500, detail="Error handling emergency")
-
-async def handle_emergency_background(vehicle_id: str, emergency_data: Dict[str, Any]):
-    """Background task to handle emergency"""
-    try:
-        result = await orchestrator.handle_emergency_situation(vehicle_id, emergency_data)
-        logger.info(f"Emergency handled for vehicle {vehicle_id}: {result}")
-    except Exception as e:
-        logger.error(f"Error handling emergency: {str(e)}")
-
-# Import json for JSON parsing
-import json 
\ No newline at end of file
+        logger.error("Error handling emergency: %s", e)
+        raise HTTPException(status_code=500, detail="Error handling emergency") 
\ No newline at end of file
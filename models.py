@@ -53,8 +53,8 @@ class Vehicle(VehicleBase):
     last_maintenance: Optional[datetime] = Field(None, description="Last maintenance date")
     mileage: Optional[int] = Field(None, description="Current mileage")
     fuel_level: Optional[float] = Field(None, description="Current fuel level percentage")
-    created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -94,14 +94,14 @@ class HealthAnalysis(BaseModel):
     maintenance_predictions: List[MaintenancePrediction] = Field(default_factory=list, description="Maintenance predictions")
     alerts: List[Dict[str, Any]] = Field(default_factory=list, description="Generated alerts")
     recommendations: List[Dict[str, Any]] = Field(default_factory=list, description="Maintenance recommendations")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
 
 # Alert Models
 class Alert(BaseModel):
     id: str = Field(..., description="Alert identifier")
     type: AlertType = Field(..., description="Alert type")
     message: str = Field(..., description="Alert message")
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp: Optional[datetime] = None
     action_required: bool = Field(default=True, description="Whether action is required")
     vehicle_id: str = Field(..., description="Associated vehicle")
 
@@ -152,8 +152,8 @@ class Booking(BookingBase):
     booking_id: str = Field(..., description="Unique booking identifier")
     workshop_name: str = Field(..., description="Workshop name")
     status: BookingStatus = Field(default=BookingStatus.SCHEDULED, description="Booking status")
-    created_at: datetime = Field(default_factory=datetime.now)
-    updated_at: datetime = Field(default_factory=datetime.now)
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -3,13 +3,20 @@ import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
 
+from cachetools import TTLCache
+
 from .health_monitor import HealthMonitorAgent
 from .planner import PlannerAgent, MaintenanceTask
 from .communicator import CommunicatorAgent
 from .logger import LoggerAgent
 
+# Bounds on the in-memory view of recently reporting vehicles
+MAX_ACTIVE_VEHICLES = 10_000
+ACTIVE_VEHICLE_TTL = 3600  # seconds
+
 class OrchestratorAgent:
     """
     AI Agent that coordinates multi-agent workflows and manages the overall system
@@ -22,8 +29,17 @@ class OrchestratorAgent:
         self.logger_agent = LoggerAgent()
         self.logger = logging.getLogger(__name__)
         
-        # System state
-        self.active_vehicles = {}
+        # The workshop registry is static, so resolve each workshop's contact address once
+        self._workshop_email_cache = {
+            workshop.id: self.communicator._get_workshop_email(workshop.id)
+            for workshop in self.planner.workshops
+        }
+        
+        # Thread pool for the agents' blocking SMTP and SQLite calls
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="orchestrator")
+        
+        # System state; vehicles that stop reporting age out instead of accumulating
+        self.active_vehicles = TTLCache(maxsize=MAX_ACTIVE_VEHICLES, ttl=ACTIVE_VEHICLE_TTL)
         self.pending_maintenance = []
         self.system_status = 'operational'
         
@@ -32,32 +48,42 @@ class OrchestratorAgent:
         Process incoming vehicle telemetry through the complete workflow
         """
         try:
-            self.logger.info(f"Processing telemetry for vehicle {vehicle_id}")
+            self.logger.info("Processing telemetry for vehicle %s", vehicle_id)
+            
+            # One timestamp for the whole request keeps state and response consistent
+            ts = datetime.now().isoformat()
             
             # Step 1: Health monitoring
             health_analysis = self.health_monitor.analyze_telemetry(vehicle_id, telemetry_data)
             
-            # Step 2: Log health check
-            self.logger_agent.log_health_check(vehicle_id, health_analysis)
+            # Step 2: Log health check (queued; the insert id is not needed here)
+            self.logger_agent.log_health_check_async(vehicle_id, health_analysis)
             
             # Step 3: Update vehicle state
             self.active_vehicles[vehicle_id] = {
-                'last_telemetry': telemetry_data,
-                'health_analysis': health_analysis,
-                'last_updated': datetime.now().isoformat()
+                'health_score': health_analysis.get('health_score', 0),
+                'last_updated': ts
             }
             
+            # Steps 4-6 are independent, so run them concurrently
+            follow_ups = []
+            
             # Step 4: Check for critical issues
             if health_analysis.get('health_score', 100) < 50:
-                await self._handle_critical_issue(vehicle_id, health_analysis)
+                follow_ups.append(self._handle_critical_issue(vehicle_id, health_analysis))
             
             # Step 5: Process maintenance predictions
             if health_analysis.get('maintenance_predictions'):
-                await self._process_maintenance_predictions(vehicle_id, health_analysis['maintenance_predictions'])
+                follow_ups.append(self._process_maintenance_predictions(vehicle_id, health_analysis['maintenance_predictions']))
             
             # Step 6: Send alerts if needed
             if health_analysis.get('alerts'):
-                await self._send_alerts(vehicle_id, health_analysis['alerts'])
+                follow_ups.append(self._send_alerts(vehicle_id, health_analysis['alerts']))
+            
+            if follow_ups:
+                for result in await asyncio.gather(*follow_ups, return_exceptions=True):
+                    if isinstance(result, Exception):
+                        self.logger.error("Error in telemetry follow-up for vehicle %s: %s", vehicle_id, result)
             
             return {
                 'vehicle_id': vehicle_id,
@@ -65,11 +91,11 @@ class OrchestratorAgent:
                 'health_score': health_analysis.get('health_score'),
                 'alerts_count': len(health_analysis.get('alerts', [])),
                 'maintenance_predictions_count': len(health_analysis.get('maintenance_predictions', [])),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': ts
             }
             
         except Exception as e:
-            self.logger.error(f"Error processing telemetry for vehicle {vehicle_id}: {str(e)}")
+            self.logger.error("Error processing telemetry for vehicle %s: %s", vehicle_id, e)
             return {'error': str(e)}
     
     async def schedule_maintenance_workflow(self, vehicle_id: str, maintenance_tasks: List[Dict]) -> Dict:
@@ -77,7 +103,7 @@ class OrchestratorAgent:
         Coordinate the complete maintenance scheduling workflow
         """
         try:
-            self.logger.info(f"Scheduling maintenance for vehicle {vehicle_id}")
+            self.logger.info("Scheduling maintenance for vehicle %s", vehicle_id)
             
             # Step 1: Convert to MaintenanceTask objects
             tasks = []
@@ -92,17 +118,17 @@ class OrchestratorAgent:
                 tasks.append(task)
             
             # Step 2: Schedule with planner
-            scheduled_bookings = self.planner.schedule_maintenance(tasks)
+            scheduled_bookings = await self._run_blocking(self.planner.schedule_maintenance, tasks)
             
-            # Step 3: Log bookings
-            for booking in scheduled_bookings:
-                self.logger_agent.log_booking(booking)
+            if scheduled_bookings:
+                # Step 3: Log bookings
+                await self._run_blocking(self.logger_agent.log_bookings, scheduled_bookings)
                 
                 # Step 4: Send notifications
-                await self._send_booking_notifications(booking)
+                await asyncio.gather(*[self._send_booking_notifications(booking) for booking in scheduled_bookings])
             
             # Step 5: Log audit event
-            self.logger_agent.log_audit_event(
+            self.logger_agent.log_audit_event_async(
                 action_type='maintenance_scheduled',
                 entity_type='vehicle',
                 entity_id=vehicle_id,
@@ -118,7 +144,7 @@ class OrchestratorAgent:
             }
             
         except Exception as e:
-            self.logger.error(f"Error scheduling maintenance for vehicle {vehicle_id}: {str(e)}")
+            self.logger.error("Error scheduling maintenance for vehicle %s: %s", vehicle_id, e)
             return {'error': str(e)}
     
     async def handle_emergency_situation(self, vehicle_id: str, emergency_data: Dict) -> Dict:
@@ -126,26 +152,20 @@ class OrchestratorAgent:
         Handle emergency situations with immediate response
         """
         try:
-            self.logger.warning(f"Emergency situation for vehicle {vehicle_id}")
+            self.logger.warning("Emergency situation for vehicle %s", vehicle_id)
             
             # Step 1: Log emergency
-            self.logger_agent.log_audit_event(
+            self.logger_agent.log_audit_event_async(
                 action_type='emergency_declared',
                 entity_type='vehicle',
                 entity_id=vehicle_id,
                 details=emergency_data
             )
             
-            # Step 2: Send emergency notifications
-            recipients = ['fleet-manager@company.com', 'emergency@company.com']
-            notification_result = self.communicator.send_emergency_notification(
-                vehicle_id, emergency_data, recipients
-            )
-            
-            # Step 3: Update system status
+            # Step 2: Update system status
             self.system_status = 'emergency'
             
-            # Step 4: Create immediate maintenance task
+            # Step 3: Create immediate maintenance task
             emergency_task = MaintenanceTask(
                 vehicle_id=vehicle_id,
                 task_type='emergency_repair',
@@ -154,8 +174,15 @@ class OrchestratorAgent:
                 estimated_cost=500.0
             )
             
-            # Step 5: Schedule emergency maintenance
-            emergency_bookings = self.planner.schedule_maintenance([emergency_task])
+            # Step 4: Send emergency notifications and schedule emergency maintenance side by side
+            recipients = ['fleet-manager@company.com', 'emergency@company.com']
+            notification_result, emergency_bookings = await asyncio.gather(
+                self._run_blocking(
+                    self.communicator.send_emergency_notification,
+                    vehicle_id, emergency_data, recipients
+                ),
+                self._run_blocking(self.planner.schedule_maintenance, [emergency_task])
+            )
             
             return {
                 'vehicle_id': vehicle_id,
@@ -167,12 +194,16 @@ class OrchestratorAgent:
             }
             
         except Exception as e:
-            self.logger.error(f"Error handling emergency for vehicle {vehicle_id}: {str(e)}")
+            self.logger.error("Error handling emergency for vehicle %s: %s", vehicle_id, e)
             return {'error': str(e)}
     
-    async def generate_fleet_report(self, start_date: str, end_date: str) -> Dict:
+    async def generate_fleet_report(self, start_date: str, end_date: str,
+                                    fleet_telemetry: Optional[List[Dict]] = None) -> Dict:
         """
         Generate comprehensive fleet report
+        
+        fleet_telemetry holds the latest reading of each vehicle and is scored in one vectorized
+        pass; without it the report covers the vehicles this orchestrator has processed recently
         """
         try:
             self.logger.info("Generating fleet report")
@@ -186,24 +217,44 @@ class OrchestratorAgent:
                 'generated_at': datetime.now().isoformat()
             }
             
+            if fleet_telemetry is not None:
+                health_scores = self.health_monitor.score_telemetry_batch(fleet_telemetry)
+                vehicle_health = dict(zip([t['vehicle_id'] for t in fleet_telemetry], health_scores.tolist()))
+            else:
+                # Snapshot recent vehicles so entries expiring mid-report don't skew the totals
+                vehicle_health = {
+                    vehicle_id: vehicle['health_score']
+                    for vehicle_id, vehicle in dict(self.active_vehicles).items()
+                }
+            
+            # Tally the fleet's latest health scores in a single pass
+            total_score = 0
+            operational = above_80 = below_50 = 0
+            
+            for score in vehicle_health.values():
+                total_score += score
+                operational += score > 70
+                above_80 += score > 80
+                below_50 += score < 50
+            
             # Get fleet summary
             report['fleet_summary'] = {
-                'total_vehicles': len(self.active_vehicles),
-                'operational_vehicles': len([v for v in self.active_vehicles.values() 
-                                           if v['health_analysis'].get('health_score', 0) > 70]),
-                'maintenance_required': len([v for v in self.active_vehicles.values() 
-                                           if v['health_analysis'].get('health_score', 0) < 50])
+                'total_vehicles': len(vehicle_health),
+                'operational_vehicles': operational,
+                'maintenance_required': below_50
             }
             
-            # Get maintenance summary for each vehicle
+            # Get maintenance summary for each vehicle, exporting the reports concurrently
             maintenance_summary = {}
             total_cost = 0.0
             
-            for vehicle_id in self.active_vehicles.keys():
-                maintenance_report = self.logger_agent.export_maintenance_report(
-                    vehicle_id, start_date, end_date
-                )
-                
+            vehicle_ids = list(vehicle_health)
+            maintenance_reports = await asyncio.gather(*[
+                self._run_blocking(self.logger_agent.export_maintenance_report, vehicle_id, start_date, end_date)
+                for vehicle_id in vehicle_ids
+            ])
+            
+            for vehicle_id, maintenance_report in zip(vehicle_ids, maintenance_reports):
                 if 'error' not in maintenance_report:
                     maintenance_summary[vehicle_id] = maintenance_report
                     total_cost += maintenance_report.get('total_cost', 0.0)
@@ -211,23 +262,20 @@ class OrchestratorAgent:
             report['maintenance_summary'] = maintenance_summary
             report['cost_analysis'] = {
                 'total_maintenance_cost': total_cost,
-                'average_cost_per_vehicle': total_cost / len(self.active_vehicles) if self.active_vehicles else 0
+                'average_cost_per_vehicle': total_cost / len(vehicle_health) if vehicle_health else 0
             }
             
             # Get health summary
-            health_scores = [v['health_analysis'].get('health_score', 0) 
-                           for v in self.active_vehicles.values()]
-            
             report['health_summary'] = {
-                'average_health_score': sum(health_scores) / len(health_scores) if health_scores else 0,
-                'vehicles_above_80': len([score for score in health_scores if score > 80]),
-                'vehicles_below_50': len([score for score in health_scores if score < 50])
+                'average_health_score': total_score / len(vehicle_health) if vehicle_health else 0,
+                'vehicles_above_80': above_80,
+                'vehicles_below_50': below_50
             }
             
             return report
             
         except Exception as e:
-            self.logger.error(f"Error generating fleet report: {str(e)}")
+            self.logger.error("Error generating fleet report: %s", e)
             return {'error': str(e)}
     
     async def _handle_critical_issue(self, vehicle_id: str, health_analysis: Dict):
@@ -237,10 +285,12 @@ class OrchestratorAgent:
         try:
             # Send immediate notification
             recipients = ['fleet-manager@company.com']
-            self.communicator.send_maintenance_alert(vehicle_id, health_analysis, recipients)
+            await self._run_blocking(
+                self.communicator.send_maintenance_alert, vehicle_id, health_analysis, recipients
+            )
             
             # Log critical issue
-            self.logger_agent.log_audit_event(
+            self.logger_agent.log_audit_event_async(
                 action_type='critical_issue_detected',
                 entity_type='vehicle',
                 entity_id=vehicle_id,
@@ -248,62 +298,77 @@ class OrchestratorAgent:
             )
             
         except Exception as e:
-            self.logger.error(f"Error handling critical issue: {str(e)}")
+            self.logger.error("Error handling critical issue: %s", e)
     
     async def _process_maintenance_predictions(self, vehicle_id: str, predictions: List[Dict]):
         """
         Process maintenance predictions and create tasks
         """
         try:
-            for prediction in predictions:
-                if prediction.get('urgency') == 'high':
-                    # Create immediate maintenance task
-                    task = MaintenanceTask(
-                        vehicle_id=vehicle_id,
-                        task_type=prediction['type'],
-                        urgency=prediction['urgency'],
-                        estimated_duration=prediction.get('estimated_duration', 2),
-                        estimated_cost=prediction.get('estimated_cost', 100.0)
-                    )
-                    
-                    # Schedule maintenance
-                    bookings = self.planner.schedule_maintenance([task])
-                    
-                    if bookings:
-                        # Log the booking
-                        self.logger_agent.log_booking(bookings[0])
-                        
-                        # Send notification
-                        await self._send_booking_notifications(bookings[0])
+            # Create immediate maintenance tasks for the urgent predictions
+            tasks = [
+                MaintenanceTask(
+                    vehicle_id=vehicle_id,
+                    task_type=prediction['type'],
+                    urgency=prediction['urgency'],
+                    estimated_duration=prediction.get('estimated_duration', 2),
+                    estimated_cost=prediction.get('estimated_cost', 100.0)
+                )
+                for prediction in predictions
+                if prediction.get('urgency') == 'high'
+            ]
+            
+            if not tasks:
+                return
+            
+            # Schedule them together
+            bookings = await self._run_blocking(self.planner.schedule_maintenance, tasks)
+            
+            if bookings:
+                # Log the bookings
+                await self._run_blocking(self.logger_agent.log_bookings, bookings)
+                
+                # Send notifications
+                await asyncio.gather(*[self._send_booking_notifications(booking) for booking in bookings])
             
         except Exception as e:
-            self.logger.error(f"Error processing maintenance predictions: {str(e)}")
+            self.logger.error("Error processing maintenance predictions: %s", e)
     
     async def _send_alerts(self, vehicle_id: str, alerts: List[Dict]):
         """
         Send alerts to appropriate recipients
         """
-        try:
-            recipients = ['fleet-manager@company.com']
-            
-            for alert in alerts:
-                if alert.get('type') == 'critical':
-                    self.communicator.send_maintenance_alert(vehicle_id, alert, recipients)
-                    
-        except Exception as e:
-            self.logger.error(f"Error sending alerts: {str(e)}")
+        recipients = ['fleet-manager@company.com']
+        critical_alerts = [alert for alert in alerts if alert.get('type') == 'critical']
+        
+        results = await asyncio.gather(*[
+            self._run_blocking(self.communicator.send_maintenance_alert, vehicle_id, alert, recipients)
+            for alert in critical_alerts
+        ], return_exceptions=True)
+        
+        # One failed send must not drop the others; report each failure on its own
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error("Error sending alerts: %s", result)
     
     async def _send_booking_notifications(self, booking: Dict):
         """
         Send booking notifications to workshop
         """
         try:
-            workshop_email = self.communicator._get_workshop_email(booking['workshop_id'])
+            workshop_email = self._workshop_email_cache.get(booking['workshop_id'])
             if workshop_email:
-                self.communicator.send_booking_confirmation(booking, workshop_email)
+                await self._run_blocking(self.communicator.send_booking_confirmation, booking, workshop_email)
                 
         except Exception as e:
-            self.logger.error(f"Error sending booking notifications: {str(e)}")
+            self.logger.error("Error sending booking notifications: %s", e)
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """
+        Run a blocking agent call on the thread pool so it does not stall the event loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
     
     def get_system_status(self) -> Dict:
         """
@@ -337,12 +402,18 @@ class OrchestratorAgent:
                 'shutdown_time': datetime.now().isoformat()
             }
             
-            self.logger_agent.log_audit_event(
+            self.logger_agent.log_audit_event_async(
                 action_type='system_shutdown',
                 entity_type='system',
                 entity_id='orchestrator',
                 details=final_state
             )
             
+            # Flush any queued health/audit logs
+            self.logger_agent.close()
+            
+            # Let in-flight notifications finish before the pool goes away
+            self._executor.shutdown(wait=True)
+            
         except Exception as e:
-            self.logger.error(f"Error during shutdown: {str(e)}") 
\ No newline at end of file
+            self.logger.error("Error during shutdown: %s", e) 
\ No newline at end of file
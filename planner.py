@@ -1,9 +1,29 @@
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+import numpy as np
 
-@dataclass
+from ..api.database import new_booking_id
+
+# Day names as used in Workshop.availability, indexed by datetime.weekday()
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Booking score multiplier per task urgency; unknown urgencies score as 1.0
+URGENCY_MULTIPLIERS = {
+    'high': 1.5,
+    'medium': 1.0,
+    'low': 0.8
+}
+
+# Booking score bonus by slot start hour: mornings preferred, then afternoons
+HOUR_BONUS = np.zeros(24, dtype=np.float64)
+HOUR_BONUS[9:12] = 10
+HOUR_BONUS[14:17] = 5
+MAX_HOUR_BONUS = float(HOUR_BONUS.max())
+
+@dataclass(slots=True, frozen=True)
 class Workshop:
     id: str
     name: str
@@ -13,7 +33,14 @@ class Workshop:
     rating: float
     cost_multiplier: float
 
-@dataclass
+@dataclass(slots=True)
+class SlotTable:
+    """Available slots of one workshop as parallel arrays, one entry per slot"""
+    hours: np.ndarray  # int8 slot start hours
+    dates: List[str]
+    times: List[str]
+
+@dataclass(slots=True)
 class MaintenanceTask:
     vehicle_id: str
     task_type: str
@@ -32,6 +59,13 @@ class PlannerAgent:
         self.workshops = self._initialize_workshops()
         self.logger = logging.getLogger(__name__)
         
+        # Lookup structures derived once from the workshop registry
+        self._workshops_by_id: Dict[str, Workshop] = {}
+        self._service_index: Dict[str, List[Workshop]] = defaultdict(list)
+        self._slot_times: Dict[str, Dict[int, List[Tuple[int, str]]]] = {}
+        self._base_scores: Dict[str, float] = {}
+        self._index_workshops()
+        
     def _initialize_workshops(self) -> List[Workshop]:
         """
         Initialize available workshops
@@ -90,137 +124,154 @@ class PlannerAgent:
         """
         scheduled_bookings = []
         
+        # Slots depend only on the workshop and today's date, so enumerate each workshop once per batch
+        workshop_slots: Dict[str, SlotTable] = {}
+        
         for task in maintenance_tasks:
             try:
                 # Find suitable workshops
                 suitable_workshops = self._find_suitable_workshops(task)
                 
                 if not suitable_workshops:
-                    self.logger.warning(f"No suitable workshops found for task {task.task_type}")
+                    self.logger.warning("No suitable workshops found for task %s", task.task_type)
                     continue
                 
                 # Select optimal workshop and time slot
-                booking = self._optimize_booking(task, suitable_workshops)
+                booking = self._optimize_booking(task, suitable_workshops, workshop_slots)
                 
                 if booking:
                     scheduled_bookings.append(booking)
                     
             except Exception as e:
-                self.logger.error(f"Error scheduling task for vehicle {task.vehicle_id}: {str(e)}")
+                self.logger.error("Error scheduling task for vehicle %s: %s", task.vehicle_id, e)
         
         return scheduled_bookings
     
+    def _index_workshops(self):
+        """
+        Index workshops by id and service, pre-parse slot times into (hour, label) keyed by weekday index
+        and precompute each workshop's rating/cost score before urgency and slot-hour adjustments
+        """
+        for workshop in self.workshops:
+            self._workshops_by_id[workshop.id] = workshop
+            self._base_scores[workshop.id] = workshop.rating * 10 + (1.0 / workshop.cost_multiplier) * 20
+            
+            for service in workshop.services:
+                self._service_index[service].append(workshop)
+            
+            self._slot_times[workshop.id] = {
+                weekday: [(int(time_slot.split(':', 1)[0]), time_slot) for time_slot in workshop.availability[day]]
+                for weekday, day in enumerate(WEEKDAYS)
+                if day in workshop.availability
+            }
+    
     def _find_suitable_workshops(self, task: MaintenanceTask) -> List[Workshop]:
         """
         Find workshops that can handle the maintenance task
         """
-        suitable_workshops = []
-        
-        for workshop in self.workshops:
-            if task.task_type in workshop.services:
-                suitable_workshops.append(workshop)
-        
-        return suitable_workshops
+        return self._service_index.get(task.task_type, [])
     
-    def _optimize_booking(self, task: MaintenanceTask, workshops: List[Workshop]) -> Optional[Dict]:
+    def _optimize_booking(self, task: MaintenanceTask, workshops: List[Workshop],
+                          workshop_slots: Dict[str, SlotTable]) -> Optional[Dict]:
         """
         Optimize workshop selection and time slot booking
+        
+        workshop_slots caches available slots by workshop id across the tasks of one batch
         """
-        best_booking = None
-        best_score = float('-inf')
+        urgency_multiplier = URGENCY_MULTIPLIERS.get(task.urgency, 1.0)
+        best = None  # (score, position in workshops, workshop, slot table, slot index)
         
-        for workshop in workshops:
-            # Find available time slots
-            available_slots = self._find_available_slots(workshop, task)
+        # Visit workshops from the highest possible score down and stop once none can beat the best so far
+        for position, workshop in sorted(enumerate(workshops), key=lambda item: -self._base_scores[item[1].id]):
+            upper_bound = self._base_scores[workshop.id] * urgency_multiplier + MAX_HOUR_BONUS
+            if best is not None and best[0] > upper_bound:
+                break
             
-            for slot in available_slots:
-                score = self._calculate_booking_score(task, workshop, slot)
-                
-                if score > best_score:
-                    best_score = score
-                    best_booking = {
-                        'booking_id': f"booking_{datetime.now().timestamp()}",
-                        'vehicle_id': task.vehicle_id,
-                        'workshop_id': workshop.id,
-                        'workshop_name': workshop.name,
-                        'task_type': task.task_type,
-                        'scheduled_date': slot['date'],
-                        'scheduled_time': slot['time'],
-                        'estimated_duration': task.estimated_duration,
-                        'estimated_cost': task.estimated_cost * workshop.cost_multiplier,
-                        'urgency': task.urgency,
-                        'status': 'scheduled'
-                    }
+            if workshop.id not in workshop_slots:
+                workshop_slots[workshop.id] = self._find_available_slots(workshop)
+            table = workshop_slots[workshop.id]
+            
+            if not table.times:
+                continue
+            
+            scores = self._calculate_booking_scores(task, workshop.rating, workshop.cost_multiplier, table.hours)
+            slot = int(np.argmax(scores))
+            score = scores[slot]
+            
+            # Ties go to the workshop listed first, as in a plain in-order scan
+            if best is None or score > best[0] or (score == best[0] and position < best[1]):
+                best = (score, position, workshop, table, slot)
+        
+        if best is None:
+            return None
         
-        return best_booking
+        _, _, workshop, table, slot = best
+        
+        return {
+            'booking_id': new_booking_id(),
+            'vehicle_id': task.vehicle_id,
+            'workshop_id': workshop.id,
+            'workshop_name': workshop.name,
+            'task_type': task.task_type,
+            'scheduled_date': table.dates[slot],
+            'scheduled_time': table.times[slot],
+            'estimated_duration': task.estimated_duration,
+            'estimated_cost': task.estimated_cost * workshop.cost_multiplier,
+            'urgency': task.urgency,
+            'status': 'scheduled'
+        }
     
-    def _find_available_slots(self, workshop: Workshop, task: MaintenanceTask) -> List[Dict]:
+    def _find_available_slots(self, workshop: Workshop) -> SlotTable:
         """
         Find available time slots for the workshop
         """
-        available_slots = []
+        hours, dates, times = [], [], []
         current_date = datetime.now()
+        slot_times = self._slot_times[workshop.id]
         
         # Look for slots in the next 14 days
         for day_offset in range(14):
             check_date = current_date + timedelta(days=day_offset)
-            day_name = check_date.strftime('%A').lower()
+            day_slots = slot_times.get(check_date.weekday())
             
-            if day_name in workshop.availability:
-                for time_slot in workshop.availability[day_name]:
+            if day_slots:
+                date_str = check_date.date().isoformat()
+                for hour, time_slot in day_slots:
                     # Check if slot is available (simplified - in real app would check against existing bookings)
-                    slot = {
-                        'date': check_date.strftime('%Y-%m-%d'),
-                        'time': time_slot,
-                        'datetime': check_date.replace(
-                            hour=int(time_slot.split(':')[0]),
-                            minute=int(time_slot.split(':')[1])
-                        )
-                    }
-                    available_slots.append(slot)
+                    hours.append(hour)
+                    dates.append(date_str)
+                    times.append(time_slot)
         
-        return available_slots
+        return SlotTable(hours=np.array(hours, dtype=np.int8), dates=dates, times=times)
     
-    def _calculate_booking_score(self, task: MaintenanceTask, workshop: Workshop, slot: Dict) -> float:
+    def _calculate_booking_scores(self, task: MaintenanceTask, rating: float,
+                                  cost_multiplier: float, slot_hours: np.ndarray) -> np.ndarray:
         """
-        Calculate booking score based on multiple factors
+        Calculate booking scores for one workshop across its candidate slot hours
         """
-        score = 0.0
-        
         # Workshop rating (0-5 scale)
-        score += workshop.rating * 10
+        score = rating * 10
         
         # Cost factor (lower is better)
-        cost_factor = 1.0 / workshop.cost_multiplier
+        cost_factor = 1.0 / cost_multiplier
         score += cost_factor * 20
         
         # Urgency factor
-        urgency_multiplier = {
-            'high': 1.5,
-            'medium': 1.0,
-            'low': 0.8
-        }
-        score *= urgency_multiplier.get(task.urgency, 1.0)
-        
-        # Time preference (earlier slots get higher scores)
-        slot_hour = int(slot['time'].split(':')[0])
-        if 9 <= slot_hour <= 11:  # Morning slots preferred
-            score += 10
-        elif 14 <= slot_hour <= 16:  # Afternoon slots
-            score += 5
+        score *= URGENCY_MULTIPLIERS.get(task.urgency, 1.0)
         
-        return score
+        # Time preference (earlier slots get higher scores), one table lookup per slot
+        return score + HOUR_BONUS[slot_hours]
     
     def get_workshop_availability(self, workshop_id: str, date: str) -> Dict:
         """
         Get workshop availability for a specific date
         """
-        workshop = next((w for w in self.workshops if w.id == workshop_id), None)
+        workshop = self._workshops_by_id.get(workshop_id)
         
         if not workshop:
             return {'error': 'Workshop not found'}
         
-        day_name = datetime.strptime(date, '%Y-%m-%d').strftime('%A').lower()
+        day_name = WEEKDAYS[datetime.strptime(date, '%Y-%m-%d').weekday()]
         available_slots = workshop.availability.get(day_name, [])
         
         return {
@@ -0,0 +1,157 @@
+from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from typing import List, Dict, Any, Optional
+import asyncio
+import logging
+import os
+
+from .database import SessionLocal
+from .crud import get_latest_fleet_telemetry, set_system_status, update_vehicle
+from ..agents.orchestrator import OrchestratorAgent
+
+# Celery configuration
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+
+celery_app = Celery("fleet", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"]
+)
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on telemetry items processed by the agents at once
+TELEMETRY_CONCURRENCY = 16
+telemetry_semaphore = asyncio.Semaphore(TELEMETRY_CONCURRENCY)
+
+# One event loop per worker process, so pooled async DB connections stay on the loop that opened them
+_loop = None
+
+def run_async(coro):
+    """Run an agent coroutine on the worker's event loop"""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+# Each worker process runs its own agents. They are built after the fork: the
+# logger agent's writer thread would not survive into prefork children
+_orchestrator: Optional[OrchestratorAgent] = None
+
+def get_orchestrator() -> OrchestratorAgent:
+    """Return this process's orchestrator, creating it on first use"""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = OrchestratorAgent()
+    return _orchestrator
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the agents in each freshly forked worker child"""
+    get_orchestrator()
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Flush the agents' queued logs before the worker process exits"""
+    global _orchestrator
+    if _orchestrator is not None:
+        run_async(_orchestrator.shutdown())
+        _orchestrator = None
+
+async def process_telemetry(vehicle_id: str, telemetry_data: Dict) -> Dict:
+    """Process telemetry with AI agents and store the resulting health score"""
+    # Process with orchestrator
+    result = await get_orchestrator().process_vehicle_telemetry(vehicle_id, telemetry_data)
+
+    # Update vehicle health score in database
+    if 'health_score' in result:
+        async with SessionLocal() as db:
+            await update_vehicle(db, vehicle_id, {'health_score': result['health_score']})
+
+    logger.info("Telemetry processed for vehicle %s: %s", vehicle_id, result)
+    return result
+
+@celery_app.task
+def process_telemetry_task(vehicle_id: str, telemetry_data: Dict) -> Dict:
+    """Worker task to process telemetry with AI agents"""
+    try:
+        return run_async(process_telemetry(vehicle_id, telemetry_data))
+    except Exception as e:
+        logger.error("Error in background telemetry processing: %s", e)
+        return {'error': str(e)}
+
+@celery_app.task
+def process_telemetry_batch_task(telemetry_batch: List[Dict]) -> Dict:
+    """Worker task to process a telemetry batch concurrently"""
+    async def process_single(telemetry_data: Dict):
+        async with telemetry_semaphore:
+            return await process_telemetry(telemetry_data['vehicle_id'], telemetry_data)
+
+    async def process_batch():
+        return await asyncio.gather(
+            *[process_single(telemetry_data) for telemetry_data in telemetry_batch],
+            return_exceptions=True
+        )
+
+    results = run_async(process_batch())
+
+    failures = sum(1 for result in results if isinstance(result, Exception))
+    if failures:
+        logger.error("%s of %s telemetry items failed background processing", failures, len(results))
+
+    return {'processed': len(results) - failures, 'failed': failures}
+
+@celery_app.task
+def schedule_maintenance_task(vehicle_id: str, tasks: List[Dict]) -> Dict:
+    """Worker task to schedule maintenance"""
+    try:
+        result = run_async(get_orchestrator().schedule_maintenance_workflow(vehicle_id, tasks))
+        logger.info("Maintenance scheduled for vehicle %s: %s", vehicle_id, result)
+        return result
+    except Exception as e:
+        logger.error("Error scheduling maintenance: %s", e)
+        return {'error': str(e)}
+
+async def generate_fleet_report(start_date: str, end_date: str) -> Dict:
+    """Generate the fleet report by scoring the latest stored telemetry of the whole fleet"""
+    # Workers only see the vehicles they processed themselves; the database sees them all
+    async with SessionLocal() as db:
+        fleet_telemetry = await get_latest_fleet_telemetry(db)
+
+    return await get_orchestrator().generate_fleet_report(start_date, end_date, fleet_telemetry)
+
+@celery_app.task
+def generate_fleet_report_task(start_date: str, end_date: str) -> Dict:
+    """Worker task to generate fleet report"""
+    try:
+        report = run_async(generate_fleet_report(start_date, end_date))
+        logger.info("Fleet report generated: %s", report)
+        return report
+    except Exception as e:
+        logger.error("Error generating fleet report: %s", e)
+        return {'error': str(e)}
+
+async def handle_emergency(vehicle_id: str, emergency_data: Dict[str, Any]) -> Dict:
+    """Handle an emergency and record the resulting system status for the API"""
+    orchestrator = get_orchestrator()
+    result = await orchestrator.handle_emergency_situation(vehicle_id, emergency_data)
+
+    # The status flip happens in this worker process; the API reads it from the database
+    async with SessionLocal() as db:
+        await set_system_status(db, orchestrator.system_status)
+
+    return result
+
+@celery_app.task
+def handle_emergency_task(vehicle_id: str, emergency_data: Dict[str, Any]) -> Dict:
+    """Worker task to handle emergency"""
+    try:
+        result = run_async(handle_emergency(vehicle_id, emergency_data))
+        logger.info("Emergency handled for vehicle %s: %s", vehicle_id, result)
+        return result
+    except Exception as e:
+        logger.error("Error handling emergency: %s", e)
+        return {'error': str(e)}
\ No newline at end of file